@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .cache import user_cache
+from .models import StatelessUser
+
+# claims added to the tokens by accounts.serializers, enough to authorize without the user row
+USER_CLAIMS = ('is_staff', 'is_superuser')
+
+
+def add_user_claims(token, user):
+    """
+    Embed the authorization flags of the user in the token
+    """
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that resolves the user from an in-process cache
+    instead of a SELECT per request.
+
+    With JWT_USER_CACHE['TRUST_TOKEN_CLAIMS'] the user isn't loaded at all,
+    it's built from the token claims. Changes to is_active/is_staff/is_superuser
+    then only apply once the access token expires.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        if settings.JWT_USER_CACHE['TRUST_TOKEN_CLAIMS'] and all(
+                claim in validated_token for claim in USER_CLAIMS):
+            return self.get_stateless_user(user_id, validated_token)
+
+        user = user_cache.get(self.user_model, user_id)
+        if user is None:
+            # raises for unknown or inactive users, those are never cached
+            user = super(CachedJWTAuthentication, self).get_user(validated_token)
+            user_cache.set(user_id, user)
+        return user
+
+    def get_stateless_user(self, user_id, validated_token):
+        """
+        Returns a read-only user carrying the id and the flags of the token,
+        good for permission checks and as a foreign key value
+        """
+        user = StatelessUser(**{api_settings.USER_ID_FIELD: user_id}, is_active=True)
+        for claim in USER_CLAIMS:
+            setattr(user, claim, validated_token[claim])
+        user._state.adding = False
+        return user
@@ -0,0 +1,65 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class UserCache:
+    """
+    Bounded in-process LRU cache of user rows with a TTL.
+
+    Rows are stored as plain field values and turned into a fresh model
+    instance on every hit, so requests never share (and mutate) the same object.
+    It's per process, entries of other processes are only dropped by the TTL,
+    keep it short.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def max_size(self):
+        return settings.JWT_USER_CACHE['MAX_SIZE']
+
+    @property
+    def ttl(self):
+        return settings.JWT_USER_CACHE['TTL']
+
+    def get(self, user_model, user_id):
+        """
+        Returns a user instance or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, db, field_names, values = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+        return user_model.from_db(db, field_names, values)
+
+    def set(self, user_id, user):
+        if self.max_size <= 0:
+            return
+        field_names = [field.attname for field in user._meta.concrete_fields]
+        values = [getattr(user, field_name) for field_name in field_names]
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, user._state.db, field_names, values)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
@@ -0,0 +1,28 @@
+# Generated by Django 3.0 on 2026-10-18 09:19
+
+import django.contrib.auth.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_auto_20220413_1142'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatelessUser',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('accounts.customuser',),
+            managers=[
+                ('objects', django.contrib.auth.models.UserManager()),
+            ],
+        ),
+    ]
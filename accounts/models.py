@@ -4,8 +4,12 @@ from django.contrib.auth.models import AbstractUser
 # Keeping scope to modify the user model
 from django.core.validators import validate_email
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
 
+from .cache import user_cache
+
 
 class CustomUser(AbstractUser):
     """
@@ -32,3 +36,28 @@ class CustomUser(AbstractUser):
         return super(CustomUser, self).save(*args, **kwargs)
 
 
+class StatelessUser(CustomUser):
+    """
+    User built from the claims of an access token, without its row,
+    see accounts.authentication. Read-only: its blank fields must never
+    overwrite the real user
+    """
+
+    class Meta:
+        proxy = True
+
+    def save(self, *args, **kwargs):
+        raise NotImplementedError('A stateless user is built from a token and cannot be saved')
+
+    def delete(self, *args, **kwargs):
+        raise NotImplementedError('A stateless user is built from a token and cannot be deleted')
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_cached_user(sender, instance, *args, **kwargs):
+    """
+    Drop the cached user of the jwt authentication, covers is_active/is_staff changes too
+    """
+    user_cache.invalidate(instance.pk)
+
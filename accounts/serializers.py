@@ -1,7 +1,13 @@
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
 
 from django.contrib.auth import get_user_model
 
+from .authentication import add_user_claims
+
 
 class SignupSerializer(serializers.ModelSerializer):
     """
@@ -28,3 +34,32 @@ class SignupSerializer(serializers.ModelSerializer):
         user = get_user_model().objects.create_user(**validated_data)
         return user
 
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Token pair serializer embedding the authorization flags of the user,
+    used by the stateless mode of accounts.authentication.CachedJWTAuthentication
+    """
+    @classmethod
+    def get_token(cls, user):
+        return add_user_claims(super().get_token(user), user)
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh serializer re-reading the flags of the user, otherwise the access token
+    would carry the claims copied from the refresh token for its whole lifetime
+    """
+    def validate(self, attrs):
+        data = super(ClaimsTokenRefreshSerializer, self).validate(attrs)
+        access = AccessToken(data['access'], verify=False)
+
+        user = get_user_model().objects.filter(
+            **{api_settings.USER_ID_FIELD: access[api_settings.USER_ID_CLAIM]}
+        ).first()
+        if user is None or not user.is_active:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+
+        data['access'] = str(add_user_claims(access, user))
+        return data
+
@@ -0,0 +1,108 @@
+import jwt
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from accounts.authentication import CachedJWTAuthentication
+from accounts.cache import user_cache
+
+
+class CachedJWTAuthenticationTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.token_url = reverse('accounts:token_obtain_pair')
+        cls.refresh_url = reverse('accounts:token_refresh')
+        cls.url = reverse('events:events')
+
+    def setUp(self) -> None:
+        user_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username='test',
+            password='pass#123',
+            email='test@example.com'
+        )
+        response = self.client.post(self.token_url, {'username': 'test', 'password': 'pass#123'})
+        self.access_token = response.data['access']
+        self.refresh_token = response.data['refresh']
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer {}'.format(self.access_token))
+
+    def test_token_carries_user_claims(self):
+        decoded_dict = jwt.decode(self.access_token, settings.SECRET_KEY, algorithms=['HS256'])
+        self.assertFalse(decoded_dict['is_staff'])
+        self.assertFalse(decoded_dict['is_superuser'])
+
+    def test_user_is_loaded_once(self):
+        """
+        Test that the user row is read on the first request only,
+        the event list queries (validators and page) are the only ones left afterwards
+        """
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_deactivated_user_is_rejected(self):
+        """
+        Test that saving the user invalidates the cached one
+        """
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_staff_change_is_seen(self):
+        """
+        Test that the flags of the cached user follow the changes
+        """
+        admin_url = reverse('events:participants', args=[1])
+        response = self.client.get(admin_url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(admin_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_refreshed_access_token_gets_current_claims(self):
+        self.user.is_staff = True
+        self.user.save()
+
+        response = self.client.post(self.refresh_url, {'refresh': self.refresh_token})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        decoded_dict = jwt.decode(response.data['access'], settings.SECRET_KEY, algorithms=['HS256'])
+        self.assertTrue(decoded_dict['is_staff'])
+
+    def test_refresh_fails_for_deactivated_user(self):
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.post(self.refresh_url, {'refresh': self.refresh_token})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_trusted_claims_do_not_load_the_user(self):
+        jwt_user_cache = dict(settings.JWT_USER_CACHE, TRUST_TOKEN_CLAIMS=True)
+        with override_settings(JWT_USER_CACHE=jwt_user_cache):
+            with self.assertNumQueries(2):
+                response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_stateless_user_cannot_be_saved(self):
+        authentication = CachedJWTAuthentication()
+        validated_token = authentication.get_validated_token(self.access_token.encode())
+        user = authentication.get_stateless_user(self.user.pk, validated_token)
+
+        self.assertIsInstance(user, get_user_model())
+        with self.assertRaises(NotImplementedError):
+            user.save()
+        with self.assertRaises(NotImplementedError):
+            user.delete()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.email, 'test@example.com')
@@ -0,0 +1,75 @@
+"""
+Per request latency of the database connection modes.
+
+Replays the request cycle (request_started, one small query, request_finished)
+against the configured PostgreSQL, the way Django handles a request, with:
+
+    fresh       CONN_MAX_AGE=0, a new connection per request
+    persistent  CONN_MAX_AGE=60, health checks on
+    pooled      in-process pool, connections handed back after each request
+
+usage: python benchmarks/db_connections.py [--requests 500]
+reads the same POSTGRESQL_* environment variables as the project
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import django
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'event_management_proj.settings')
+
+MODES = {
+    'fresh': {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False, 'pool': None},
+    'persistent': {'CONN_MAX_AGE': 60, 'CONN_HEALTH_CHECKS': True, 'pool': None},
+    'pooled': {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': True, 'pool': {'min_size': 1, 'max_size': 4}},
+}
+
+
+def run(mode, requests):
+    from django.core.signals import request_finished, request_started
+    from django.db import connection
+
+    connection.close()
+    connection.settings_dict['CONN_MAX_AGE'] = mode['CONN_MAX_AGE']
+    connection.settings_dict['CONN_HEALTH_CHECKS'] = mode['CONN_HEALTH_CHECKS']
+    connection.settings_dict['OPTIONS'].pop('pool', None)
+    if mode['pool']:
+        connection.settings_dict['OPTIONS']['pool'] = mode['pool']
+
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        request_started.send(sender=None)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+        request_finished.send(sender=None)
+        timings.append((time.perf_counter() - start) * 1000)
+    connection.close()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=500)
+    args = parser.parse_args()
+
+    django.setup()
+    print('{:<12}{:>10}{:>10}{:>10}'.format('mode', 'p50 ms', 'p95 ms', 'mean ms'))
+    for name, mode in MODES.items():
+        timings = sorted(run(mode, args.requests))
+        print('{:<12}{:>10.2f}{:>10.2f}{:>10.2f}'.format(
+            name,
+            statistics.median(timings),
+            timings[int(len(timings) * 0.95) - 1],
+            statistics.mean(timings),
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Throughput of the event import/export pipeline.
+
+Generates --rows events as csv, imports them with each --batch-size
+and exports them back, against a throwaway test database created
+on the configured PostgreSQL (the data of the project is not touched).
+
+usage: python benchmarks/event_import.py [--rows 100000] [--batch-size 500 1000 5000]
+reads the same POSTGRESQL_* environment variables as the project
+"""
+import argparse
+import csv
+import io
+import os
+import sys
+import time
+
+import django
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'event_management_proj.settings')
+
+
+def generate_csv(rows):
+    from events.services.catalog import IMPORT_FIELDS
+
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(IMPORT_FIELDS)
+    for i in range(rows):
+        day = 1 + i % 28
+        writer.writerow((
+            'Event {}'.format(i),
+            'Short description {}'.format(i),
+            'Long description of the event {}'.format(i),
+            '2030-02-{:02d} 10:00:00'.format(day),
+            '2030-02-{:02d} 12:00:00'.format(day),
+            '2030-01-01 00:00:00',
+            '2030-01-31 00:00:00',
+            100,
+            True,
+        ))
+    return output.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--batch-size', type=int, nargs='+', default=[500, 1000, 5000])
+    args = parser.parse_args()
+
+    django.setup()
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+
+    from core.streaming import read_csv, stream_csv
+    from events.models import Event
+    from events.services.catalog import EXPORT_FIELDS, export_rows, import_events
+
+    content = generate_csv(args.rows)
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        organizer = get_user_model().objects.create_user('benchmark', email='benchmark@example.com')
+        print('{:<16}{:>10}{:>12}'.format('step', 'seconds', 'rows/s'))
+        for batch_size in args.batch_size:
+            Event.objects.all().delete()
+            start = time.perf_counter()
+            result = import_events(read_csv(io.StringIO(content)), organizer, batch_size=batch_size)
+            elapsed = time.perf_counter() - start
+            print('{:<16}{:>10.2f}{:>12.0f}'.format('import {}'.format(batch_size), elapsed, result.created / elapsed))
+
+        start = time.perf_counter()
+        response = stream_csv('events', EXPORT_FIELDS, export_rows())
+        exported = sum(1 for _ in response.streaming_content) - 1
+        elapsed = time.perf_counter() - start
+        print('{:<16}{:>10.2f}{:>12.0f}'.format('export', elapsed, exported / elapsed))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Closed loop HTTP load test, compares the serving profiles.
+
+Each of --concurrency threads sends its requests back to back on a
+keep-alive connection and the latency of every request is recorded, e.g.
+
+    docker-compose up                                            # runserver
+    python benchmarks/load_test.py --url http://localhost:8080/events --token $TOKEN
+
+    docker-compose -f docker-compose.yml -f docker-compose.prod.yml up   # gunicorn
+    python benchmarks/load_test.py --url http://localhost:8080/events --token $TOKEN
+"""
+import argparse
+import http.client
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def worker(url, headers, count, timings, errors, lock):
+    parts = urlsplit(url)
+    connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+    connection = connection_class(parts.netloc, timeout=30)
+    path = parts.path + ('?' + parts.query if parts.query else '')
+
+    local_timings, local_errors = [], 0
+    for _ in range(count):
+        start = time.perf_counter()
+        try:
+            connection.request('GET', path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status >= 400:
+                local_errors += 1
+        except (OSError, http.client.HTTPException):
+            local_errors += 1
+            connection.close()
+            continue
+        local_timings.append((time.perf_counter() - start) * 1000)
+    connection.close()
+
+    with lock:
+        timings.extend(local_timings)
+        errors.append(local_errors)
+
+
+def percentile(values, percent):
+    return values[max(int(len(values) * percent / 100) - 1, 0)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default='http://localhost:8080/events')
+    parser.add_argument('--token', help='access token, sent as Bearer')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=50, help='per connection')
+    args = parser.parse_args()
+
+    headers = {'Connection': 'keep-alive'}
+    if args.token:
+        headers['Authorization'] = 'Bearer {}'.format(args.token)
+
+    timings, errors, lock = [], [], threading.Lock()
+    threads = [
+        threading.Thread(target=worker, args=(args.url, headers, args.requests, timings, errors, lock))
+        for _ in range(args.concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    timings.sort()
+    print('requests   {}'.format(args.concurrency * args.requests))
+    print('errors     {}'.format(sum(errors)))
+    print('req/s      {:.1f}'.format(len(timings) / elapsed))
+    if timings:
+        print('p50 ms     {:.2f}'.format(statistics.median(timings)))
+        print('p95 ms     {:.2f}'.format(percentile(timings, 95)))
+        print('p99 ms     {:.2f}'.format(percentile(timings, 99)))
+
+
+if __name__ == '__main__':
+    main()
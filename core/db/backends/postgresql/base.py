@@ -0,0 +1,119 @@
+"""
+PostgreSQL backend with connection health checks and an optional pool.
+
+Health checks: a persistent connection (CONN_MAX_AGE > 0) is pinged once
+at the first query of each request, a connection dropped by the server
+(restart, idle timeout, failover) is replaced instead of failing the request.
+Enabled by ``CONN_HEALTH_CHECKS`` in the database settings.
+
+Pool: with ``OPTIONS['pool'] = {'min_size': ..., 'max_size': ...}`` the
+connections are borrowed from a per process psycopg2 ThreadedConnectionPool
+and handed back on close, so CONN_MAX_AGE should be 0 and max_size at least
+the number of threads of the worker.
+"""
+import os
+import threading
+
+from django.db.backends.postgresql import base
+from psycopg2 import pool as pg_pool
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, conn_params, min_size, max_size):
+    """
+    Returns the pool of the alias for the current process,
+    a forked worker doesn't reuse the sockets of its parent
+    """
+    key = (os.getpid(), alias)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = pg_pool.ThreadedConnectionPool(min_size, max_size, **conn_params)
+        return _pools[key]
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    health_check_done = False
+    pool = None
+
+    @property
+    def pool_options(self):
+        return self.settings_dict['OPTIONS'].get('pool')
+
+    def get_connection_params(self):
+        conn_params = super(DatabaseWrapper, self).get_connection_params()
+        # not a libpq parameter
+        conn_params.pop('pool', None)
+        return conn_params
+
+    def get_new_connection(self, conn_params):
+        if not self.pool_options:
+            return super(DatabaseWrapper, self).get_new_connection(conn_params)
+
+        self.pool = get_pool(
+            self.alias,
+            conn_params,
+            self.pool_options.get('min_size', 1),
+            self.pool_options['max_size'],
+        )
+        connection = self.pool.getconn()
+        if self.settings_dict.get('CONN_HEALTH_CHECKS') and not self.is_alive(connection):
+            # idle in the pool while the server dropped it
+            self.pool.putconn(connection, close=True)
+            connection = self.pool.getconn()
+
+        # same as the parent once connected
+        options = self.settings_dict['OPTIONS']
+        try:
+            self.isolation_level = options['isolation_level']
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+        return connection
+
+    def _close(self):
+        if self.connection is None or not self.pool_options:
+            return super(DatabaseWrapper, self)._close()
+
+        with self.wrap_database_errors:
+            # broken connections are discarded, open transactions are rolled back by the pool
+            unusable = self.errors_occurred and not self.is_alive(self.connection)
+            self.pool.putconn(self.connection, close=unusable)
+
+    def _cursor(self, name=None):
+        if (
+            self.connection is not None
+            and self.settings_dict.get('CONN_HEALTH_CHECKS')
+            and not self.health_check_done
+            and not self.in_atomic_block
+        ):
+            if not self.is_alive(self.connection):
+                self.close()
+            self.health_check_done = True
+        return super(DatabaseWrapper, self)._cursor(name)
+
+    def connect(self):
+        super(DatabaseWrapper, self).connect()
+        # fresh connection, nothing to check for this request
+        self.health_check_done = True
+
+    def close_if_unusable_or_obsolete(self):
+        # called at the start and the end of every request
+        super(DatabaseWrapper, self).close_if_unusable_or_obsolete()
+        self.health_check_done = False
+
+    def is_alive(self, connection):
+        if connection.closed:
+            return False
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            if not connection.autocommit:
+                # don't leave the ping transaction open
+                connection.rollback()
+        except base.Database.Error:
+            return False
+        return True
@@ -1,3 +1,19 @@
-from django.db import models
+class OwnedModelMixin:
+    """
+    Mixin for models that belong to a user.
+    The model declares the foreign key to its owner with ``owner_field``,
+    ownership is then checked on the fk id without loading the owner row.
+    """
+    owner_field = 'owner'
 
-# Create your models here.
+    def get_owner_id(self):
+        """
+        Returns the id of the owner, read from the fk column
+        """
+        return getattr(self, self._meta.get_field(self.owner_field).attname)
+
+    def is_owned_by(self, user):
+        """
+        Returns True if the user owns the object
+        """
+        return user.pk is not None and self.get_owner_id() == user.pk
@@ -0,0 +1,148 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (a.k.a. seek) pagination.
+
+    The cursor holds the ordering values of the last/first row of the page,
+    the next page is fetched with a WHERE on those values instead of an OFFSET,
+    so every page costs the same no matter how deep the client goes and
+    rows inserted meanwhile don't shift the pages.
+
+    ``ordering`` should be backed by an index, its fields must be non nullable
+    and the last one unique (usually ``id``) to break the ties.
+    """
+    ordering = ('-id',)
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+
+        cursor = self.decode_cursor(request, queryset.model)
+        values, reverse = cursor if cursor else (None, False)
+
+        ordering = self.get_ordering(reverse)
+        queryset = queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self.get_seek_filter(ordering, values))
+
+        # fetch one extra row to know if there is more to come
+        results = list(queryset[:page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if reverse:
+            results.reverse()
+
+        if reverse:
+            self.has_next, self.has_previous = values is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, values is not None
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                return _positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                    cutoff=self.max_page_size
+                )
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_ordering(self, reverse=False):
+        """
+        Returns the ordering, with flipped directions when paging backwards
+        """
+        if not reverse:
+            return tuple(self.ordering)
+        return tuple(field[1:] if field.startswith('-') else '-' + field for field in self.ordering)
+
+    def get_seek_filter(self, ordering, values):
+        """
+        Rows strictly after ``values`` in ``ordering``, i.e. for (-a, b):
+        a < va OR (a = va AND b > vb)
+        """
+        seek_filter = Q()
+        for index, field in enumerate(ordering):
+            name = field.lstrip('-')
+            lookup = '{}__{}'.format(name, 'lt' if field.startswith('-') else 'gt')
+            condition = Q(**{lookup: values[index]})
+            for previous_field, previous_value in zip(ordering[:index], values[:index]):
+                condition &= Q(**{previous_field.lstrip('-'): previous_value})
+            seek_filter |= condition
+        return seek_filter
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            # paged past the end, step back from where we are
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, instance, reverse):
+        values = []
+        for field in self.ordering:
+            value = getattr(instance, field.lstrip('-'))
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        payload = json.dumps({'v': values, 'r': int(reverse)}, separators=(',', ':'))
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request, model):
+        """
+        Returns (values, reverse) from the cursor query param or None on the first page
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            values, reverse = payload['v'], bool(payload['r'])
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError
+            return [self.to_python(model, field, value) for field, value in zip(self.ordering, values)], reverse
+        except (TypeError, ValueError, KeyError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def to_python(self, model, field, value):
+        """
+        Convert a cursor value back with the model field, annotations are kept as they are
+        """
+        try:
+            model_field = model._meta.get_field(field.lstrip('-'))
+        except FieldDoesNotExist:
+            return value
+        return model_field.to_python(value)
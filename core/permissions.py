@@ -6,8 +6,13 @@ class IsAdminOrOwnerOnly(BasePermission):
         """
         Defines if the user has permission to access the object.
         Used for the detail view.
+        Objects implementing core.models.OwnedModelMixin are checked
+        on the owner fk id, which costs no query.
         """
-        return (
-                request.user.is_authenticated and
-                (request.user.is_staff or obj.owner == request.user)
-        )
+        if not request.user.is_authenticated:
+            return False
+        if request.user.is_staff:
+            return True
+        if hasattr(obj, 'is_owned_by'):
+            return obj.is_owned_by(request.user)
+        return obj.owner == request.user
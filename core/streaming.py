@@ -0,0 +1,77 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+
+class Echo:
+    """
+    File-like object whose write() hands back the value,
+    lets csv.writer produce one line at a time without buffering the file
+    """
+    def write(self, value):
+        return value
+
+
+def stream_csv(filename, header, rows):
+    """
+    Streams the rows as a csv attachment
+    """
+    writer = csv.writer(Echo())
+
+    def lines():
+        yield writer.writerow(header)
+        for row in rows:
+            yield writer.writerow(row)
+
+    response = StreamingHttpResponse(lines(), content_type='text/csv')
+    response['Content-Disposition'] = 'attachment; filename="{}.csv"'.format(filename)
+    return response
+
+
+def stream_ndjson(filename, header, rows):
+    """
+    Streams the rows as newline delimited json objects keyed by the header
+    """
+    def lines():
+        for row in rows:
+            yield json.dumps(dict(zip(header, row)), cls=DjangoJSONEncoder) + '\n'
+
+    response = StreamingHttpResponse(lines(), content_type='application/x-ndjson')
+    response['Content-Disposition'] = 'attachment; filename="{}.ndjson"'.format(filename)
+    return response
+
+
+# export format -> streaming function
+STREAMERS = {
+    'csv': stream_csv,
+    'ndjson': stream_ndjson,
+}
+
+
+def read_csv(lines):
+    """
+    Parses csv lines into dicts keyed by the header, one row at a time
+    """
+    return csv.DictReader(lines)
+
+
+def read_ndjson(lines):
+    """
+    Parses newline delimited json objects, one row at a time, blank lines are skipped
+    a malformed line comes out as None so the caller can report it and carry on
+    """
+    for line in lines:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None
+
+
+# import format -> parsing function
+READERS = {
+    'csv': read_csv,
+    'ndjson': read_ndjson,
+}
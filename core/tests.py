@@ -1,3 +1,78 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from core.db.backends.postgresql.base import DatabaseWrapper
+
+
+def make_wrapper(**settings):
+    settings_dict = {
+        'ENGINE': 'core.db.backends.postgresql',
+        'NAME': 'event_management_db',
+        'USER': 'db_user',
+        'PASSWORD': 'db_password',
+        'HOST': 'db',
+        'PORT': '5432',
+        'ATOMIC_REQUESTS': False,
+        'AUTOCOMMIT': True,
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {},
+        'TIME_ZONE': None,
+        'TEST': {},
+    }
+    settings_dict.update(settings)
+    wrapper = DatabaseWrapper(settings_dict)
+    wrapper.autocommit = True
+    return wrapper
+
+
+class PostgresqlBackendTestCase(SimpleTestCase):
+    """
+    Test the connection handling of core.db.backends.postgresql without a server
+    """
+
+    def test_pool_options_are_not_passed_to_libpq(self):
+        wrapper = make_wrapper(OPTIONS={'pool': {'max_size': 4}, 'sslmode': 'prefer'})
+
+        params = wrapper.get_connection_params()
+
+        self.assertNotIn('pool', params)
+        self.assertEqual(params['sslmode'], 'prefer')
+
+    def test_reused_connection_is_pinged_once_per_request(self):
+        wrapper = make_wrapper()
+        wrapper.connection = mock.Mock(closed=0, autocommit=True)
+
+        with mock.patch.object(DatabaseWrapper, 'is_alive', return_value=True) as is_alive, \
+                mock.patch.object(DatabaseWrapper, 'create_cursor'):
+            wrapper.close_if_unusable_or_obsolete()
+            wrapper._cursor()
+            wrapper._cursor()
+
+        is_alive.assert_called_once_with(wrapper.connection)
+
+    def test_dropped_connection_is_replaced(self):
+        wrapper = make_wrapper()
+        dropped = mock.Mock(closed=0, autocommit=True)
+        wrapper.connection = dropped
+
+        with mock.patch.object(DatabaseWrapper, 'is_alive', return_value=False), \
+                mock.patch.object(DatabaseWrapper, 'connect') as connect, \
+                mock.patch.object(DatabaseWrapper, 'create_cursor'):
+            wrapper.close_if_unusable_or_obsolete()
+            wrapper._cursor()
+
+        dropped.close.assert_called_once_with()
+        connect.assert_called_once_with()
+
+    def test_health_checks_disabled(self):
+        wrapper = make_wrapper(CONN_HEALTH_CHECKS=False)
+        wrapper.connection = mock.Mock(closed=0, autocommit=True)
+
+        with mock.patch.object(DatabaseWrapper, 'is_alive') as is_alive, \
+                mock.patch.object(DatabaseWrapper, 'create_cursor'):
+            wrapper.close_if_unusable_or_obsolete()
+            wrapper._cursor()
+
+        is_alive.assert_not_called()
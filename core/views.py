@@ -1,3 +1,53 @@
-from django.shortcuts import render
+import hashlib
+from calendar import timegm
 
-# Create your views here.
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalGetMixin:
+    """
+    Answers conditional GETs (If-None-Match / If-Modified-Since) with a 304
+    from cheap validators, before the serializer runs.
+
+    Views implement get_validators() returning (fingerprint, last_modified),
+    or None when there's nothing to validate against (e.g. not found).
+    The fingerprint is hashed with the requested url and user into the ETag.
+    """
+
+    def get_validators(self):
+        raise NotImplementedError('`get_validators()` must be implemented.')
+
+    def get_etag(self, fingerprint):
+        request = self.request
+        raw = '{}|{}|{}'.format(request.get_full_path(), request.user.pk, fingerprint)
+        return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+    def get(self, request, *args, **kwargs):
+        validators = self.get_validators()
+        if validators is None:
+            return super(ConditionalGetMixin, self).get(request, *args, **kwargs)
+
+        fingerprint, last_modified = validators
+        etag = self.get_etag(fingerprint)
+        if last_modified is not None:
+            if timezone.is_naive(last_modified):
+                last_modified = timezone.make_aware(last_modified)
+            last_modified = timegm(last_modified.utctimetuple())
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is not None:
+            if response.status_code == 304:
+                self.set_validator_headers(response, etag, last_modified)
+            return response
+
+        response = super(ConditionalGetMixin, self).get(request, *args, **kwargs)
+        if response.status_code == 200:
+            self.set_validator_headers(response, etag, last_modified)
+        return response
+
+    def set_validator_headers(self, response, etag, last_modified):
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
@@ -14,6 +14,8 @@ import sys
 from datetime import timedelta
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -21,12 +23,17 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # See https://docs.djangoproject.com/en/3.2/howto/deployment/checklist/
 
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'django-insecure-q6rq!_fd4-i6)q!#_*22ko#(bomglkr8x--^leettlm6k2vpan'
+# it signs the JWTs too, the default (same as .env.example) is public, development only
+SECRET_KEY = os.environ.get('SECRET_KEY', 'django-insecure-q6rq!_fd4-i6)q!#_*22ko#(bomglkr8x--^leettlm6k2vpan')
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.environ.get('DEBUG', '1') == '1'
+
+if not DEBUG and SECRET_KEY.startswith('django-insecure-'):
+    raise ImproperlyConfigured('SECRET_KEY is the public development key, set a secret one with DEBUG=0')
 
-ALLOWED_HOSTS = []
+# comma separated, e.g. ALLOWED_HOSTS=api.example.com,localhost
+ALLOWED_HOSTS = [host for host in os.environ.get('ALLOWED_HOSTS', '').split(',') if host]
 
 # Application definition
 
@@ -91,18 +98,58 @@ WSGI_APPLICATION = 'event_management_proj.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql_psycopg2',
+        # postgresql_psycopg2 plus health checks and the optional pool, see core.db.backends.postgresql
+        'ENGINE': 'core.db.backends.postgresql',
         'NAME': os.environ.get("POSTGRESQL_DATABASE"),
         'USER': os.environ.get("POSTGRESQL_USERNAME"),
         "PASSWORD": os.environ.get("POSTGRESQL_PASSWORD"),
         "HOST": os.environ.get("POSTGRESQL_HOST"),
-        "PORT": os.environ.get("POSTGRESQL_PORT")
+        "PORT": os.environ.get("POSTGRESQL_PORT"),
+        # seconds to keep a connection open between requests, 0 closes it after every request
+        'CONN_MAX_AGE': int(os.environ.get('POSTGRESQL_CONN_MAX_AGE', 60)),
+        # ping a reused connection before its first query in a request
+        'CONN_HEALTH_CHECKS': os.environ.get('POSTGRESQL_CONN_HEALTH_CHECKS', '1') == '1',
+        'OPTIONS': {},
     }
 }
 
-if 'test' in sys.argv or 'test\_coverage' in sys.argv:  # Covers regular testing and django-coverage
+# in-process connection pool, disabled when POSTGRESQL_POOL_MAX_SIZE is 0,
+# max size should be at least the number of threads of a worker
+if int(os.environ.get('POSTGRESQL_POOL_MAX_SIZE', 0)):
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.environ.get('POSTGRESQL_POOL_MIN_SIZE', 1)),
+        'max_size': int(os.environ.get('POSTGRESQL_POOL_MAX_SIZE')),
+    }
+    # connections go back to the pool at the end of the request
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+
+# TEST_DATABASE=postgresql runs the tests on the configured postgres instead,
+# e.g. for the postgres query plan and trigger tests
+if ('test' in sys.argv or 'test\_coverage' in sys.argv) and \
+        os.environ.get('TEST_DATABASE') != 'postgresql':  # Covers regular testing and django-coverage
     DATABASES['default']['ENGINE'] = 'django.db.backends.sqlite3'
     DATABASES['default']['NAME'] = ':memory:'
+    DATABASES['default']['OPTIONS'] = {}
+
+# local memory by default, point CACHE_BACKEND/CACHE_LOCATION to a shared
+# (e.g. Redis) cache when running several processes, e.g.
+# CACHE_BACKEND=django_redis.cache.RedisCache CACHE_LOCATION=redis://redis:6379/1
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'event-management'),
+    }
+}
+
+# cache of the serialized events, see events.cache
+EVENTS_CACHE = {
+    'ALIAS': 'default',
+    # seconds
+    'TIMEOUT': int(os.environ.get('EVENTS_CACHE_TIMEOUT', 300)),
+}
+
+# seconds a seat stays held for a checkout, see events.services.holds
+SEAT_HOLD_TIMEOUT = int(os.environ.get('SEAT_HOLD_TIMEOUT', 600))
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -121,11 +168,21 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     # jwt authentication for better security
+    # users are resolved from an in-process cache, see JWT_USER_CACHE
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     )
 }
 
+JWT_USER_CACHE = {
+    'MAX_SIZE': int(os.environ.get('JWT_USER_CACHE_MAX_SIZE', 1024)),
+    # seconds, other processes only see user changes after it
+    'TTL': int(os.environ.get('JWT_USER_CACHE_TTL', 60)),
+    # build the user from the token claims without any query,
+    # changes of is_active/is_staff/is_superuser then apply when the access token expires
+    'TRUST_TOKEN_CLAIMS': os.environ.get('JWT_TRUST_TOKEN_CLAIMS', '0') == '1',
+}
+
 # Internationalization
 # https://docs.djangoproject.com/en/3.2/topics/i18n/
 
@@ -210,6 +267,8 @@ SIMPLE_JWT = {
     'USER_AUTHENTICATION_RULE': 'rest_framework_simplejwt.authentication.default_user_authentication_rule',
 
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
+    'TOKEN_OBTAIN_SERIALIZER': 'accounts.serializers.ClaimsTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.serializers.ClaimsTokenRefreshSerializer',
     'TOKEN_TYPE_CLAIM': 'token_type',
     'TOKEN_USER_CLASS': 'rest_framework_simplejwt.models.TokenUser',
 
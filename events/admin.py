@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Event, Booking
+from .models import Event, Booking, SeatHold, WaitlistEntry
 
 
 #
@@ -11,5 +11,15 @@ class CustomBookingAdmin(admin.ModelAdmin):
     )
 
 
+class CustomWaitlistEntryAdmin(admin.ModelAdmin):
+    list_display = ('id', 'event', 'user', 'created_at')
+
+
+class CustomSeatHoldAdmin(admin.ModelAdmin):
+    list_display = ('id', 'event', 'user', 'expires_at')
+
+
 admin.site.register(Event)
 admin.site.register(Booking, CustomBookingAdmin)
+admin.site.register(WaitlistEntry, CustomWaitlistEntryAdmin)
+admin.site.register(SeatHold, CustomSeatHoldAdmin)
@@ -0,0 +1,130 @@
+"""
+Cache of the serialized events.
+
+Representations are stored per event and serializer variant under the
+current catalog version and version of the event. Changes of an event or its
+bookings bump the version of the event; bumping the catalog version retires
+every key at once, for writes that bypass the signals (queryset.update(), bulk_create()).
+
+The versions are read before the events are read from the db, so a late write
+of a representation read before a change lands under a retired version.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+CATALOG_VERSION_KEY = 'events:catalog_version'
+HITS_KEY = 'events:cache:hits'
+MISSES_KEY = 'events:cache:misses'
+EVENT_VERSION_KEY = 'events:version:{}'
+
+
+def get_cache():
+    return caches[settings.EVENTS_CACHE['ALIAS']]
+
+
+def get_catalog_version():
+    cache = get_cache()
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, 1, timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY, 1)
+    return version
+
+
+def bump_catalog_version():
+    """
+    Retire every cached representation
+    """
+    cache = get_cache()
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.set(CATALOG_VERSION_KEY, get_catalog_version() + 1, timeout=None)
+
+
+def get_versions(event_ids):
+    """
+    Returns {event_id: version} of the events in one round trip,
+    plus one write for the events without a version yet
+    """
+    cache = get_cache()
+    keys = {EVENT_VERSION_KEY.format(event_id): event_id for event_id in event_ids}
+    found = cache.get_many([CATALOG_VERSION_KEY] + list(keys))
+    catalog_version = found.pop(CATALOG_VERSION_KEY, None) or get_catalog_version()
+
+    # an evicted version starts over from a number it never had before
+    missing = {key: time.time_ns() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        found.update(missing)
+    return {event_id: '{}.{}'.format(catalog_version, found[key]) for key, event_id in keys.items()}
+
+
+def make_key(variant, event_id, version):
+    return 'events:{}:{}:{}'.format(variant, event_id, version)
+
+
+def _count(key, delta):
+    if not delta:
+        return
+    cache = get_cache()
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        # evicted in between, the counters are best effort
+        cache.set(key, delta, timeout=None)
+
+
+def get_many(variant, versions):
+    """
+    Returns {event_id: representation} of the cached events, versions is {event_id: version}
+    """
+    keys = {make_key(variant, event_id, version): event_id for event_id, version in versions.items()}
+    found = get_cache().get_many(keys)
+    _count(HITS_KEY, len(found))
+    _count(MISSES_KEY, len(keys) - len(found))
+    return {keys[key]: data for key, data in found.items()}
+
+
+def get(variant, event_id, version):
+    return get_many(variant, {event_id: version}).get(event_id)
+
+
+def set_many(variant, representations, versions):
+    """
+    Cache {event_id: representation} under the versions read before the events
+    """
+    get_cache().set_many(
+        {make_key(variant, event_id, versions[event_id]): data for event_id, data in representations.items()},
+        timeout=settings.EVENTS_CACHE['TIMEOUT'],
+    )
+
+
+def invalidate_event(event_id):
+    """
+    Retire the cached representations of the event, again once the transaction commits
+    so what a concurrent request cached of the pre-commit state meanwhile is retired too
+    """
+    def bump():
+        cache = get_cache()
+        key = EVENT_VERSION_KEY.format(event_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def get_stats():
+    cache = get_cache()
+    return {
+        'hits': cache.get(HITS_KEY, 0),
+        'misses': cache.get(MISSES_KEY, 0),
+        'catalog_version': get_catalog_version(),
+    }
@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from events.services.holds import expire_seat_holds
+
+
+class Command(BaseCommand):
+    """
+    Release the seats of the expired holds, batch by batch, so the booking
+    path never has to look at expired holds. Runs once, or forever with --loop
+    """
+    help = 'Release the seats of the expired seat holds'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Holds released per transaction',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep sweeping, every --interval seconds',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Seconds between two sweeps with --loop',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size should be at least 1')
+
+        while True:
+            expired = self.sweep(options['batch_size'])
+            if expired or not options['loop']:
+                self.stdout.write('Released {} expired hold(s)'.format(expired))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def sweep(self, batch_size):
+        """
+        Release every hold expired by now, one batch per transaction
+        """
+        total = 0
+        while True:
+            expired = expire_seat_holds(batch_size)
+            total += expired
+            if expired < batch_size:
+                return total
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from core.streaming import STREAMERS
+from events.services.catalog import DEFAULT_BATCH_SIZE, EXPORT_FIELDS, export_rows
+
+
+class Command(BaseCommand):
+    """
+    Export the event catalog as csv or ndjson, in the import format,
+    streamed from a server side cursor
+    """
+    help = 'Export every event as csv or ndjson'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(STREAMERS), default='csv')
+        parser.add_argument('--output', default='-', help='File to write, - for stdout')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Rows fetched per round trip',
+        )
+
+    def handle(self, *args, **options):
+        response = STREAMERS[options['format']](
+            'events', EXPORT_FIELDS, export_rows(chunk_size=options['chunk_size'])
+        )
+        chunks = (chunk.decode() for chunk in response.streaming_content)
+        if options['output'] == '-':
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+
+        with open(options['output'], 'w', newline='') as output:
+            output.writelines(chunks)
+        self.stdout.write(self.style.SUCCESS('Exported the events to {}'.format(options['output'])))
@@ -0,0 +1,70 @@
+import codecs
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.streaming import READERS
+from events.services.catalog import DEFAULT_BATCH_SIZE, import_events
+
+
+class Command(BaseCommand):
+    """
+    Import events from a csv or ndjson file, streamed and inserted
+    batch by batch, the invalid rows are reported and skipped
+    """
+    help = 'Bulk import events from a csv or ndjson file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import, - for stdin')
+        parser.add_argument('--organizer', required=True, help='Username of the organizer of the events')
+        parser.add_argument(
+            '--format',
+            choices=sorted(READERS),
+            help='Format of the file, guessed from its extension by default',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Rows validated and inserted per transaction',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only validate the rows, do not insert them',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or path.rsplit('.', 1)[-1].lower()
+        if file_format not in READERS:
+            raise CommandError('Unknown format, use --format {}'.format('/'.join(sorted(READERS))))
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size should be at least 1')
+
+        try:
+            organizer = get_user_model().objects.get(username=options['organizer'])
+        except get_user_model().DoesNotExist:
+            raise CommandError('Unknown organizer {}'.format(options['organizer']))
+
+        stream = sys.stdin.buffer if path == '-' else open(path, 'rb')
+        try:
+            # utf-8-sig drops the BOM spreadsheets put in front of csv exports
+            lines = codecs.iterdecode(stream, 'utf-8-sig')
+            result = import_events(
+                READERS[file_format](lines),
+                organizer,
+                batch_size=options['batch_size'],
+                dry_run=options['dry_run'],
+            )
+        finally:
+            if stream is not sys.stdin.buffer:
+                stream.close()
+
+        for number, message in result.errors:
+            self.stderr.write('Row {}: {}'.format(number, message))
+        verb = 'Validated' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS('{} {} event(s), skipped {} row(s)'.format(
+            verb, result.created, len(result.errors)
+        )))
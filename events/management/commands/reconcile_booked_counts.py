@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from events.cache import bump_catalog_version
+from events.models import Booking, Event
+
+
+class Command(BaseCommand):
+    """
+    Recount the bookings of every event and fix the denormalized booked_count
+    where it drifted (raw sql, restored backups, bulk deletes, etc.)
+    """
+    help = 'Reconcile Event.booked_count with the actual number of bookings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report the drifted events, do not fix them',
+        )
+
+    def handle(self, *args, **options):
+        booking_count = Booking.objects.filter(event=OuterRef('pk')).order_by().values('event').annotate(
+            count=Count('pk')
+        ).values('count')
+
+        drifted = Event.objects.annotate(
+            actual_count=Coalesce(Subquery(booking_count), 0)
+        ).exclude(booked_count=F('actual_count'))
+
+        fixed = 0
+        for event_id, booked_count, actual_count in drifted.values_list('id', 'booked_count', 'actual_count'):
+            self.stdout.write(
+                'Event {}: booked_count {} != {} bookings'.format(event_id, booked_count, actual_count)
+            )
+            if not options['dry_run']:
+                # recount inside the UPDATE so bookings made meanwhile are not lost
+                # a seat change is a change of the event for the conditional GETs too
+                fixed += Event.objects.filter(pk=event_id).update(
+                    booked_count=Coalesce(Subquery(booking_count), 0),
+                    updated_at=timezone.now(),
+                )
+
+        if fixed:
+            # the UPDATEs above don't go through the signals
+            bump_catalog_version()
+        self.stdout.write(self.style.SUCCESS('Reconciled {} event(s)'.format(fixed)))
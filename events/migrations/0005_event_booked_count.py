@@ -0,0 +1,30 @@
+# Generated by Django 3.0 on 2026-10-18 08:40
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_booked_count(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    Booking = apps.get_model('events', 'Booking')
+    booking_count = Booking.objects.filter(event=OuterRef('pk')).order_by().values('event').annotate(
+        count=Count('pk')
+    ).values('count')
+    Event.objects.update(booked_count=Coalesce(Subquery(booking_count), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0004_auto_20220413_1415'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='booked_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_booked_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 3.0 on 2026-10-18 08:42
+
+from django.db import migrations, models
+from django.db.models import Count
+
+import events.models
+
+
+def regenerate_duplicate_booking_codes(apps, schema_editor):
+    """
+    Blank or duplicated codes would violate the new unique constraint,
+    keep the oldest booking's code and give the others a fresh one
+    """
+    Booking = apps.get_model('events', 'Booking')
+    duplicated_codes = Booking.objects.order_by().values('booking_code').annotate(
+        count=Count('pk')
+    ).filter(count__gt=1).values_list('booking_code', flat=True)
+    to_regenerate = set(Booking.objects.filter(booking_code='').values_list('pk', flat=True))
+    for code in duplicated_codes:
+        to_regenerate.update(Booking.objects.filter(booking_code=code).order_by('pk').values_list('pk', flat=True)[1:])
+
+    used_codes = set(Booking.objects.values_list('booking_code', flat=True))
+    for pk in to_regenerate:
+        code = events.models.generate_booking_code()
+        while code in used_codes:
+            code = events.models.generate_booking_code()
+        used_codes.add(code)
+        Booking.objects.filter(pk=pk).update(booking_code=code)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0005_event_booked_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(regenerate_duplicate_booking_codes, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='booking',
+            name='booking_code',
+            field=models.CharField(blank=True, default=events.models.generate_booking_code, max_length=255, unique=True),
+        ),
+    ]
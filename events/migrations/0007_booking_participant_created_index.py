@@ -0,0 +1,17 @@
+# Generated by Django 3.0 on 2026-10-18 08:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0006_booking_code_unique'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['participant', 'created_at'], name='booking_participant_created'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.0 on 2026-10-18 08:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0007_booking_participant_created_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['event', 'created_at'], name='booking_event_created'),
+        ),
+    ]
@@ -0,0 +1,113 @@
+# Generated by Django 3.0 on 2026-10-18 08:59
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+# conflicting pairs listed in the error, the total is always given
+MAX_LISTED_DUPLICATES = 100
+
+
+def check_duplicate_bookings(apps, schema_editor):
+    """
+    The unique constraint needs one booking per participant and event, stop
+    with the conflicting bookings listed rather than picking the ones to drop,
+    they are customer bookings to be resolved (refunded, merged, ...) by an operator
+    """
+    Booking = apps.get_model('events', 'Booking')
+    duplicates = Booking.objects.order_by().values('event', 'participant').annotate(
+        count=Count('pk')
+    ).filter(count__gt=1).order_by('event', 'participant')
+
+    conflicts = []
+    total = 0
+    for duplicate in duplicates.iterator():
+        total += 1
+        if len(conflicts) < MAX_LISTED_DUPLICATES:
+            booking_ids = Booking.objects.filter(
+                event_id=duplicate['event'], participant_id=duplicate['participant']
+            ).order_by('pk').values_list('pk', flat=True)
+            conflicts.append('event {}, participant {}: bookings {}'.format(
+                duplicate['event'], duplicate['participant'], ', '.join(str(pk) for pk in booking_ids)
+            ))
+    if total:
+        raise RuntimeError(
+            '{} participant(s) booked the same event more than once, keep one booking each '
+            'before migrating:\n{}{}'.format(
+                total,
+                '\n'.join(conflicts),
+                '\n...' if total > len(conflicts) else '',
+            )
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('events', '0008_booking_event_created_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_bookings, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='booking',
+            name='booking_participant_created',
+        ),
+        migrations.RemoveIndex(
+            model_name='booking',
+            name='booking_event_created',
+        ),
+        migrations.AlterField(
+            model_name='booking',
+            name='event',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='events.Event'),
+        ),
+        migrations.AlterField(
+            model_name='booking',
+            name='participant',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='event',
+            name='end_date',
+            field=models.DateTimeField(),
+        ),
+        migrations.AlterField(
+            model_name='event',
+            name='start_date',
+            field=models.DateTimeField(),
+        ),
+        migrations.AlterField(
+            model_name='event',
+            name='window_end_date',
+            field=models.DateTimeField(),
+        ),
+        migrations.AlterField(
+            model_name='event',
+            name='window_start_date',
+            field=models.DateTimeField(),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['participant', '-created_at', 'id'], name='booking_participant_created'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['event', 'created_at', 'id'], name='booking_event_created'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['-start_date', 'id'], name='event_start_date_id'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(is_active=True), fields=['window_end_date', 'window_start_date'], name='event_active_window'),
+        ),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=models.UniqueConstraint(fields=('event', 'participant'), name='booking_unique_event_participant'),
+        ),
+    ]
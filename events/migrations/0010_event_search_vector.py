@@ -0,0 +1,59 @@
+# Generated by Django 3.0 on 2026-10-18 09:01
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# keep in sync with events.models.SEARCH_CONFIG
+SEARCH_VECTOR = """
+    setweight(to_tsvector('english', coalesce({row}title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce({row}short_description, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce({row}long_description, '')), 'C')
+"""
+
+
+def create_search_trigger(apps, schema_editor):
+    """
+    Maintain the vector in the database, only when the text columns are written
+    so the seat count UPDATEs of the booking path don't recompute it
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("""
+        CREATE FUNCTION events_event_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """.format(SEARCH_VECTOR.format(row='NEW.')))
+    schema_editor.execute("""
+        CREATE TRIGGER events_event_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF title, short_description, long_description ON events_event
+        FOR EACH ROW EXECUTE PROCEDURE events_event_search_vector_update()
+    """)
+    schema_editor.execute('UPDATE events_event SET search_vector = {}'.format(SEARCH_VECTOR.format(row='')))
+    schema_editor.execute('CREATE INDEX events_event_search_vector_gin ON events_event USING gin (search_vector)')
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS events_event_search_vector_gin')
+    schema_editor.execute('DROP TRIGGER IF EXISTS events_event_search_vector_trigger ON events_event')
+    schema_editor.execute('DROP FUNCTION IF EXISTS events_event_search_vector_update()')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0009_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+    ]
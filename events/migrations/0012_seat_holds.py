@@ -0,0 +1,41 @@
+# Generated by Django 3.0 on 2026-10-18 09:10
+
+import core.models
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('events', '0011_waitlist'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='held_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='SeatHold',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('event', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='seat_holds', to='events.Event')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seat_holds', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ('expires_at',),
+            },
+            bases=(core.models.OwnedModelMixin, models.Model),
+        ),
+        migrations.AddConstraint(
+            model_name='seathold',
+            constraint=models.UniqueConstraint(fields=('event', 'user'), name='seathold_unique_event_user'),
+        ),
+    ]
@@ -1,17 +1,60 @@
+import base64
 import logging
+import secrets
+from collections import Counter
+from datetime import datetime, time, timedelta
 
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
 from django.core.exceptions import ValidationError
-from django.db import models
-from django.db.models.signals import post_save, pre_save
+from django.db import IntegrityError, connections, models, transaction
+from django.db.models import (
+    Case, Count, DateTimeField, DurationField, Exists, ExpressionWrapper, F, FloatField, OuterRef, Q, Value, When
+)
+from django.db.models.functions import Cast, TruncDate, TruncDay
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
-from django.utils.crypto import get_random_string
 
 from accounts.models import CustomUser
+from core.models import OwnedModelMixin
+from .cache import invalidate_event
 
 logger = logging.getLogger(__name__)
 
+# how many fresh booking codes to try before giving up on a collision
+BOOKING_CODE_MAX_ATTEMPTS = 5
+
+# text search configuration of Event.search_vector
+SEARCH_CONFIG = 'english'
+# default ts_rank weights of the vector labels, for the substring fallback
+SEARCH_WEIGHTS = {'A': 1.0, 'B': 0.4, 'C': 0.2}
+
+
+def generate_booking_code():
+    """
+    Returns a 13 char base32 code of a random 64 bit value
+    """
+    return base64.b32encode(secrets.token_bytes(8)).decode().rstrip('=')
+
+
+def local_day_range(value):
+    """
+    Returns the half-open [start, end) range of the day of value in the configured TIME_ZONE.
+    Filtering on a range keeps the column bare so an index on it can be used,
+    unlike created_at__day/__date which wrap the column in a function.
+    """
+    if timezone.is_aware(value):
+        tz = timezone.get_default_timezone()
+        day = timezone.localtime(value, tz).date()
+        return (
+            timezone.make_aware(datetime.combine(day, time.min), tz),
+            timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min), tz),
+        )
+    # naive datetimes are already in TIME_ZONE
+    start = datetime.combine(value.date(), time.min)
+    return start, start + timedelta(days=1)
+
 
 class BaseModel(models.Model):
     """
@@ -25,20 +68,108 @@ class BaseModel(models.Model):
         abstract = True
 
 
-class Event(BaseModel):
+class EventQuerySet(models.QuerySet):
+    """
+    Custom queryset for Event, holds the reusable query shapes
+    """
+
+    def with_summary(self):
+        """
+        Annotates the figures of the event summary so they come with the event
+        in a single query instead of a COUNT per figure
+        """
+        # bounds of the last day are computed on the event side,
+        # created_at stays bare so the (event, created_at) index is usable
+        last_day_start = TruncDay('window_end_date')
+        last_day_end = ExpressionWrapper(
+            last_day_start + Value(timedelta(days=1), output_field=DurationField()),
+            output_field=DateTimeField(),
+        )
+        return self.annotate(
+            last_day_booking_count=Count(
+                'booking',
+                filter=Q(booking__created_at__gte=last_day_start, booking__created_at__lt=last_day_end),
+            ),
+        )
+
+    def registered_by(self, user):
+        """
+        Events the user booked, as an EXISTS on the (event, participant) unique index,
+        every event once whatever the number of bookings
+        """
+        return self.filter(Exists(
+            Booking.objects.filter(event=OuterRef('pk'), participant=user)
+        ))
+
+    def search(self, query):
+        """
+        Events matching the words of ``query``, annotated with their ``rank``.
+        Full-text on the maintained search_vector with postgres, a substring
+        match weighted like the vector (title > short > long description) elsewhere
+        """
+        if connections[self.db].vendor == 'postgresql':
+            search_query = SearchQuery(query, config=SEARCH_CONFIG)
+            # double precision, ts_rank's real wouldn't survive the cursor round trip
+            rank = Cast(SearchRank(F('search_vector'), search_query), FloatField())
+            return self.filter(search_vector=search_query).annotate(rank=rank)
+
+        condition = Q()
+        rank = Value(0.0, output_field=FloatField())
+        for term in query.split():
+            condition &= (
+                Q(title__icontains=term) | Q(short_description__icontains=term) | Q(long_description__icontains=term)
+            )
+            rank += Case(
+                When(title__icontains=term, then=Value(SEARCH_WEIGHTS['A'])),
+                When(short_description__icontains=term, then=Value(SEARCH_WEIGHTS['B'])),
+                When(long_description__icontains=term, then=Value(SEARCH_WEIGHTS['C'])),
+                default=Value(0.0),
+                output_field=FloatField(),
+            )
+        return self.filter(condition).annotate(rank=rank)
+
+    def open_for_booking(self, now=None):
+        """
+        Events that can be booked at ``now``, Event.is_open_for_booking in SQL,
+        annotated with their available seats
+        """
+        now = now or timezone.now()
+        return self.filter(
+            is_active=True,
+            window_start_date__lte=now,
+            window_end_date__gte=now,
+            # held seats count against the capacity too
+            booked_count__lt=F('capacity') - F('held_count'),
+        ).annotate(available_seats=F('capacity') - F('booked_count') - F('held_count'))
+
+
+class EventManager(models.Manager.from_queryset(EventQuerySet)):
+    def get_queryset(self):
+        # the search vector is only ever read by the database
+        return super(EventManager, self).get_queryset().defer('search_vector')
+
+
+class Event(OwnedModelMixin, BaseModel):
     """
     Event model holds all the info about events
     """
+    owner_field = 'organizer'
+
     title = models.CharField(max_length=255, blank=False, db_index=True)
     short_description = models.CharField(max_length=255, blank=False)
     long_description = models.TextField(blank=True, default='')
-    start_date = models.DateTimeField(db_index=True)
-    end_date = models.DateTimeField(db_index=True)
+    start_date = models.DateTimeField()
+    end_date = models.DateTimeField()
 
-    window_start_date = models.DateTimeField(db_index=True)
-    window_end_date = models.DateTimeField(db_index=True)
+    window_start_date = models.DateTimeField()
+    window_end_date = models.DateTimeField()
 
     capacity = models.PositiveIntegerField(blank=False)
+    # denormalized number of bookings, kept in sync by the Booking signals and deletes below
+    # so the booking hot path never has to COUNT the join table
+    booked_count = models.PositiveIntegerField(default=0, editable=False)
+    # denormalized number of seat holds, kept in sync by events.services.holds
+    held_count = models.PositiveIntegerField(default=0, editable=False)
     is_active = models.BooleanField(default=True)
     participants = models.ManyToManyField(get_user_model(), through='Booking',
                                           related_name='participated_events')
@@ -47,9 +178,25 @@ class Event(BaseModel):
     organizer = models.ForeignKey(get_user_model(), related_name='events',
                                   on_delete=models.CASCADE)
 
+    # weighted title (A), short (B) and long description (C), kept up to date
+    # by a postgres trigger, see migration 0010_event_search_vector
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = EventManager()
+
     class Meta:
         ordering = ['-start_date']
         get_latest_by = 'start_date'
+        indexes = [
+            # the event list and its keyset pagination
+            models.Index(fields=['-start_date', 'id'], name='event_start_date_id'),
+            # active events whose booking window contains now
+            models.Index(
+                fields=['window_end_date', 'window_start_date'],
+                name='event_active_window',
+                condition=Q(is_active=True),
+            ),
+        ]
 
     def __str__(self):
         return self.title
@@ -71,6 +218,13 @@ class Event(BaseModel):
 
     def save(self, *args, **kwargs):
         self.clean()
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # the counters are only ever changed by atomic UPDATEs and search_vector
+            # by the database, never write back a (possibly stale) in-memory value
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in ('booked_count', 'held_count', 'search_vector')
+            ]
         return super(Event, self).save(*args, **kwargs)
 
     @property
@@ -78,14 +232,14 @@ class Event(BaseModel):
         """
         Returns the number of participants for the event
         """
-        return self.participants.count()
+        return self.booked_count
 
     @property
     def remaining_seat_count(self):
         """
-        Returns the remaining seat count
+        Returns the remaining seat count, the held seats are not available
         """
-        return self.capacity - self.no_of_participants
+        return self.capacity - self.no_of_participants - self.held_count
 
     @property
     def is_open_for_booking(self):
@@ -94,25 +248,52 @@ class Event(BaseModel):
         """
 
         is_booking_window_available = self.window_start_date <= timezone.now() <= self.window_end_date
-        is_seat_available = bool(self.remaining_seat_count)
-        # both conditions should be true to open for booking
-        return is_booking_window_available and is_seat_available
+        is_seat_available = self.remaining_seat_count > 0
+        # all conditions should be true to open for booking,
+        # same as EventQuerySet.open_for_booking()
+        return self.is_active and is_booking_window_available and is_seat_available
 
     @property
     def last_day_booked_seat_count(self):
         """
         Returns the last day booked seat count
         """
+        day_start, day_end = local_day_range(self.window_end_date)
         last_day_booking_qs = Booking.objects.filter(
-            created_at__day=self.window_end_date.day,
-            created_at__month=self.window_end_date.month,
-            created_at__year=self.window_end_date.year,
-            event=self
+            event=self,
+            created_at__gte=day_start,
+            created_at__lt=day_end,
         )
         return last_day_booking_qs.count()
 
 
-class Booking(BaseModel):
+class BookingQuerySet(models.QuerySet):
+    """
+    Custom queryset for Booking
+    """
+
+    def per_day(self):
+        """
+        Returns the number of bookings per day (in TIME_ZONE) as one grouped query
+        """
+        return self.annotate(day=TruncDate('created_at')).order_by('day').values('day').annotate(
+            count=Count('pk')
+        )
+
+    def delete(self):
+        """
+        Delete the bookings and release their seats. The cascades from Event and
+        the user don't come through here, they stay fast deletes (no receiver
+        listens to Booking deletes), see release_seats_of_user()
+        """
+        with transaction.atomic(using=self.db, savepoint=False):
+            rows = list(self.order_by().select_for_update().values_list('pk', 'event_id'))
+            deleted = super(BookingQuerySet, self.filter(pk__in=[pk for pk, _ in rows])).delete()
+            release_seats(Counter(event_id for _, event_id in rows))
+        return deleted
+
+
+class Booking(OwnedModelMixin, BaseModel):
     """
     Booking model is and intermediate model between Event and User aka participants
     we can use this for through relation
@@ -120,9 +301,15 @@ class Booking(BaseModel):
     purpose of this model is to store extra info about the booking like
     creation date, payment status, etc if needed
     """
-    event = models.ForeignKey(Event, on_delete=models.CASCADE)
-    participant = models.ForeignKey(get_user_model(), on_delete=models.CASCADE)
-    booking_code = models.CharField(max_length=255, blank=True, db_index=True)
+    owner_field = 'participant'
+
+    # indexed by the composite indexes below
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, db_index=False)
+    participant = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, db_index=False)
+    # the default also covers bulk inserts like event.participants.add()
+    booking_code = models.CharField(max_length=255, blank=True, unique=True, default=generate_booking_code)
+
+    objects = BookingQuerySet.as_manager()
 
     def __str__(self):
         return self.booking_code
@@ -130,6 +317,50 @@ class Booking(BaseModel):
     class Meta:
         ordering = ('-created_at',)
         get_latest_by = 'created_at'
+        indexes = [
+            # bookings of a user, newest first, as paginated
+            models.Index(fields=['participant', '-created_at', 'id'], name='booking_participant_created'),
+            # bookings of an event in a time range (e.g. the last day count) and its participants page
+            models.Index(fields=['event', 'created_at', 'id'], name='booking_event_created'),
+        ]
+        constraints = [
+            # a user books an event once, also serves the (event, participant) lookups
+            models.UniqueConstraint(fields=['event', 'participant'], name='booking_unique_event_participant'),
+        ]
+
+    def save(self, *args, **kwargs):
+        """
+        The booking code is generated before the INSERT so a booking costs a single write.
+        On the (unlikely) collision with an existing code retry with a fresh one
+        """
+        if not self._state.adding:
+            return super(Booking, self).save(*args, **kwargs)
+
+        for attempt in range(BOOKING_CODE_MAX_ATTEMPTS):
+            if attempt or not self.booking_code:
+                self.booking_code = generate_booking_code()
+            try:
+                # savepoint, so a collision doesn't break the surrounding transaction
+                with transaction.atomic():
+                    return super(Booking, self).save(*args, **kwargs)
+            except IntegrityError:
+                if not Booking.objects.filter(booking_code=self.booking_code).exists():
+                    raise
+                logger.warning('Booking code collision, retrying: %s', self.booking_code)
+
+        raise IntegrityError('Could not generate a unique booking code')
+
+    def delete(self, *args, **kwargs):
+        """
+        Delete the booking and release its seat, see BookingQuerySet.delete()
+        """
+        with transaction.atomic(using=kwargs.get('using'), savepoint=False):
+            deleted = super(Booking, self).delete(*args, **kwargs)
+            if deleted[0]:
+                release_seats({self.event_id: 1})
+        if deleted[0] and Booking.event.is_cached(self):
+            self.event.booked_count -= 1
+        return deleted
 
     @property
     def booked_at(self):
@@ -141,9 +372,8 @@ class Booking(BaseModel):
     @property
     def owner(self):
         """
-        property to get the owner of the booking
-        Doing this to reuse the permission class where we generally
-        user obj.owner == request.user & here owner == participant
+        property to get the owner of the booking, here owner == participant
+        permission checks should rather use is_owned_by() which doesn't load the user
         """
         return self.participant
 
@@ -155,20 +385,146 @@ class Booking(BaseModel):
         return self.event.window_start_date <= timezone.now() <= self.event.window_end_date
 
 
+class WaitlistEntry(OwnedModelMixin, BaseModel):
+    """
+    A user waiting for a seat of a sold-out event, first come first served.
+    The entries are promoted to bookings in id order as seats are released,
+    see events.services.waitlist
+    """
+    owner_field = 'user'
+
+    event = models.ForeignKey(Event, related_name='waitlist', on_delete=models.CASCADE, db_index=False)
+    user = models.ForeignKey(get_user_model(), related_name='waitlist_entries', on_delete=models.CASCADE)
+
+    class Meta:
+        ordering = ('id',)
+        indexes = [
+            # the head of the queue and the positions
+            models.Index(fields=['event', 'id'], name='waitlist_event_id'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['event', 'user'], name='waitlist_unique_event_user'),
+        ]
+
+    def __str__(self):
+        return '{} waiting for {}'.format(self.user_id, self.event_id)
+
+    @property
+    def position(self):
+        """
+        Returns the 1-based position in the queue of the event, counted on the (event, id) index
+        """
+        return WaitlistEntry.objects.filter(event_id=self.event_id, id__lte=self.id).count()
+
+
+class SeatHold(OwnedModelMixin, BaseModel):
+    """
+    A seat of an event held for a user during the checkout, until expires_at.
+    Held seats count against the capacity (Event.held_count), the booking of
+    the user takes the held seat, expire_seat_holds releases the expired ones
+    """
+    owner_field = 'user'
+
+    event = models.ForeignKey(Event, related_name='seat_holds', on_delete=models.CASCADE, db_index=False)
+    user = models.ForeignKey(get_user_model(), related_name='seat_holds', on_delete=models.CASCADE)
+    # the sweeper reads the expired holds off this index
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        ordering = ('expires_at',)
+        constraints = [
+            # one hold per user and event, also serves the event lookups
+            models.UniqueConstraint(fields=['event', 'user'], name='seathold_unique_event_user'),
+        ]
+
+    def __str__(self):
+        return '{} holding a seat of {}'.format(self.user_id, self.event_id)
+
+    @property
+    def is_expired(self):
+        return self.expires_at <= timezone.now()
+
+
+def update_booked_count(event_ids, delta):
+    """
+    Atomically shift the booked_count of the given events by delta
+    using a single UPDATE so concurrent bookings never lose an increment
+    """
+    qs = Event.objects.filter(pk__in=event_ids)
+    if delta < 0:
+        # never let a drifted counter go negative, reconcile_booked_counts fixes drift
+        qs = qs.filter(booked_count__gte=-delta)
+    # a seat change is a change of the event for the conditional GETs too
+    return qs.update(booked_count=F('booked_count') + delta, updated_at=timezone.now())
+
+
 @receiver(post_save, sender=Booking)
-def generate_booking_code(sender, instance, *args, **kwargs):
-    """
-    generate a booking code on pre_save signal
-    Making this post_save instead of pre_save to make sure that at least the obj is saved in db
-    booking code even can be generated manually
-    """
-    # it should only be generated if the booking code is not there
-    if not instance.booking_code:
-        # 5 digit random string to make it unique
-        instance.booking_code = get_random_string(length=8)
-        # TODO: scope for modification the booking code isn't really 100% unique
-        # TODO: we can use uuid/ any suffix or prefix to make it unique
-        instance.save()
+def increment_booked_count(sender, instance, created, *args, **kwargs):
+    """
+    Count a newly created booking against its event
+    """
+    if not created:
+        return
+    # bookings made through events.services.booking reserve their seat up front
+    if not getattr(instance, '_seat_reserved', False):
+        update_booked_count([instance.event_id], 1)
+    invalidate_event(instance.event_id)
+    # keep an already loaded event in sync with the db
+    if Booking.event.is_cached(instance):
+        instance.event.booked_count += 1
+
+
+def release_seats(seats):
+    """
+    Give back the seats of deleted bookings, {event_id: count},
+    and hand them to the waitlists once the delete is committed
+    """
+    from .services.holds import promote_waitlist
+
+    for event_id, count in seats.items():
+        update_booked_count([event_id], -count)
+        invalidate_event(event_id)
+        transaction.on_commit(lambda event_id=event_id, count=count: promote_waitlist(event_id, count))
+
+
+@receiver(m2m_changed, sender=Event.participants.through)
+def participants_added(sender, instance, action, reverse, pk_set, *args, **kwargs):
+    """
+    event.participants.add() inserts bookings with bulk_create which skips post_save,
+    so count them here. remove()/clear() go through BookingQuerySet.delete() instead.
+    """
+    if action != 'post_add' or not pk_set:
+        return
+    if reverse:
+        # user.participated_events.add(*events), one booking per event
+        update_booked_count(pk_set, 1)
+        for event_id in pk_set:
+            invalidate_event(event_id)
+    else:
+        update_booked_count([instance.pk], len(pk_set))
+        instance.booked_count += len(pk_set)
+        invalidate_event(instance.pk)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_cached_event(sender, instance, *args, **kwargs):
+    """
+    Drop the cached representations of a changed event
+    """
+    invalidate_event(instance.pk)
+
+
+@receiver(pre_delete, sender=CustomUser)
+def release_seats_of_user(sender, instance, *args, **kwargs):
+    """
+    Release the booked and held seats of a deleted user,
+    the cascade deletes their rows without counting them
+    """
+    from .services.holds import release_holds
+
+    Booking.objects.filter(participant=instance).delete()
+    release_holds(SeatHold.objects.filter(user=instance))
 
 
 @receiver(pre_save, sender=Booking)
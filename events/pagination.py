@@ -0,0 +1,32 @@
+from core.pagination import KeysetPagination
+
+
+class EventCursorPagination(KeysetPagination):
+    """
+    Pages the event list by (-start_date, id), start_date is indexed
+    """
+    ordering = ('-start_date', 'id')
+
+
+class EventSearchCursorPagination(KeysetPagination):
+    """
+    Pages the event search results by (-rank, id),
+    expects the events annotated by EventQuerySet.search()
+    """
+    ordering = ('-rank', 'id')
+
+
+class BookingCursorPagination(KeysetPagination):
+    """
+    Pages the bookings of a user by (-created_at, id),
+    backed by the (participant, created_at) index
+    """
+    ordering = ('-created_at', 'id')
+
+
+class ParticipantCursorPagination(KeysetPagination):
+    """
+    Pages the bookings of an event in booking order,
+    backed by the (event, created_at) index
+    """
+    ordering = ('created_at', 'id')
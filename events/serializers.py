@@ -1,17 +1,100 @@
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
-from .models import Event, Booking
+from core.streaming import READERS
+from . import cache
+from .models import Event, Booking, SeatHold, WaitlistEntry
+from .services.booking import book_seat
+from .services.catalog import DEFAULT_BATCH_SIZE
 
+# participants of a single bulk booking request
+BULK_BOOKING_MAX_SIZE = 1000
 
-class EventListSerializer(serializers.ModelSerializer):
+
+class CachedEventListSerializer(serializers.ListSerializer):
+    """
+    List serializer reading the cached events in one round trip,
+    only the misses are serialized (and cached)
+    """
+
+    def to_representation(self, data):
+        events = list(data.all() if hasattr(data, 'all') else data)
+        representations = self.child.represent_many(events)
+        return [representations[event.pk] for event in events]
+
+
+class CachedEventSerializerMixin:
+    """
+    Caches the representation of the events, see events.cache
+    represent_many() reads and writes the cache for events read from the db,
+    a single event is only rendered (the retrieve view caches it itself,
+    under the version it read before the event).
+    Meta.list_serializer_class should be CachedEventListSerializer
+    """
+    cache_variant = None
+    # {event_id: representation} of the parent's page, see CachedNestedEventListSerializer
+    representations = None
+
+    def get_cache_variant(self):
+        return self.cache_variant
+
+    def get_cached_representation(self, event_id, version):
+        return cache.get(self.get_cache_variant(), event_id, version)
+
+    def cache_representation(self, event_id, data, version):
+        cache.set_many(self.get_cache_variant(), {event_id: data}, {event_id: version})
+
+    def represent_many(self, events):
+        """
+        Returns {event_id: representation} of the events. The versions are read
+        after the events, so updated_at is part of them: an event read before
+        a change is never cached for the event read after it
+        """
+        versions = cache.get_versions({event.pk for event in events})
+        versions = {event.pk: '{}.{}'.format(versions[event.pk], event.updated_at.timestamp()) for event in events}
+        variant = self.get_cache_variant()
+        representations = cache.get_many(variant, versions)
+
+        missing = {event.pk: self.render(event) for event in events if event.pk not in representations}
+        if missing:
+            cache.set_many(variant, missing, versions)
+            representations.update(missing)
+        return representations
+
+    def render(self, instance):
+        return super(CachedEventSerializerMixin, self).to_representation(instance)
+
+    def to_representation(self, instance):
+        if self.representations is not None and instance.pk in self.representations:
+            return self.representations[instance.pk]
+        return self.render(instance)
+
+
+class CachedNestedEventListSerializer(serializers.ListSerializer):
+    """
+    List serializer of rows with an `event` field of a CachedEventSerializerMixin,
+    the events of the page are read from and written to the cache at once
+    """
+
+    def to_representation(self, data):
+        rows = list(data.all() if hasattr(data, 'all') else data)
+        field = self.child.fields['event']
+        field.representations = field.represent_many({row.event.pk: row.event for row in rows}.values())
+        return super(CachedNestedEventListSerializer, self).to_representation(rows)
+
+
+class EventListSerializer(CachedEventSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for Event List View
     """
+    cache_variant = 'list'
 
     class Meta:
         model = Event
-        exclude = ('created_at', 'updated_at', 'participants')
+        exclude = ('created_at', 'updated_at', 'participants', 'search_vector')
+        list_serializer_class = CachedEventListSerializer
 
 
 class EventCreateSerializer(serializers.ModelSerializer):
@@ -22,7 +105,7 @@ class EventCreateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Event
-        fields = '__all__'
+        exclude = ('search_vector',)
         read_only_fields = ('organizer',)
 
     def validate(self, data):
@@ -39,25 +122,33 @@ class EventCreateSerializer(serializers.ModelSerializer):
         return data
 
 
-class EventRetrieveSerializer(serializers.ModelSerializer):
+class EventRetrieveSerializer(CachedEventSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for Event Retrieve View
     """
 
     class Meta:
         model = Event
-        fields = '__all__'
+        exclude = ('search_vector',)
+        list_serializer_class = CachedEventListSerializer
 
-    def to_representation(self, instance):
+    def get_fields(self):
         """
-        Override to_representation to modify the output/response
+        Override get_fields to pick the fields for the requester
+        before serializing, so the participants aren't even fetched for them
         """
-        data = super(EventRetrieveSerializer, self).to_representation(instance)
-        # we should show details of participants in public list api
+        fields = super(EventRetrieveSerializer, self).get_fields()
+        # we should not show details of participants in public api
         # for admin it's ok
         if not self.context['request'].user.is_superuser:
-            data.pop('participants')
-        return data
+            fields.pop('participants')
+        return fields
+
+    def get_cache_variant(self):
+        # participants are part of the admin representation only
+        if self.context['request'].user.is_superuser:
+            return 'retrieve_admin'
+        return 'retrieve'
 
 
 class EventUpdateSerializer(serializers.ModelSerializer):
@@ -67,7 +158,34 @@ class EventUpdateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Event
-        fields = '__all__'
+        exclude = ('search_vector',)
+
+
+class EventImportSerializer(serializers.Serializer):
+    """
+    Serializer for Event Import View, the format is guessed
+    from the file extension when not given
+    """
+    file = serializers.FileField()
+    file_format = serializers.ChoiceField(choices=sorted(READERS), required=False)
+    batch_size = serializers.IntegerField(min_value=1, max_value=10 * DEFAULT_BATCH_SIZE, default=DEFAULT_BATCH_SIZE)
+    dry_run = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        if 'file_format' not in data:
+            extension = data['file'].name.rsplit('.', 1)[-1].lower()
+            if extension not in READERS:
+                raise serializers.ValidationError({'file_format': 'Should be one of: {}'.format(', '.join(READERS))})
+            data['file_format'] = extension
+        return data
+
+
+class EventImportErrorSerializer(serializers.Serializer):
+    """
+    Serializer for the rows skipped by an event import
+    """
+    row = serializers.IntegerField(read_only=True)
+    error = serializers.CharField(read_only=True)
 
 
 class BookingListSerializer(serializers.ModelSerializer):
@@ -79,6 +197,16 @@ class BookingListSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+class BookingExpandedListSerializer(BookingListSerializer):
+    """
+    Serializer for Booking List View with the event inlined
+    """
+    event = EventListSerializer(read_only=True)
+
+    class Meta(BookingListSerializer.Meta):
+        list_serializer_class = CachedNestedEventListSerializer
+
+
 class BookingCreateSerializer(serializers.ModelSerializer):
     """
     Serializer for Booking Create View
@@ -89,14 +217,39 @@ class BookingCreateSerializer(serializers.ModelSerializer):
         model = Booking
         fields = '__all__'
 
-    def validate(self, data):
+    def create(self, validated_data):
         """
-        Validate the data event should be open for booking when the booking is created
+        Book through the booking service, the event should be open for booking
+        and have a free seat at the moment of the insert, not only at validation time
         """
-        event = Event.objects.get(id=data['event'].id)
-        if not event.is_open_for_booking:
-            raise serializers.ValidationError("Event is not open for booking")
-        return data
+        try:
+            return book_seat(validated_data['event'], validated_data['participant'])
+        except DjangoValidationError as e:
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: e.messages})
+
+
+class BookingBulkCreateSerializer(serializers.Serializer):
+    """
+    Serializer for Booking Bulk Create View, the participants are resolved
+    by the booking service in one query rather than one per id
+    """
+    event = serializers.PrimaryKeyRelatedField(queryset=Event.objects.all())
+    participants = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=BULK_BOOKING_MAX_SIZE,
+    )
+    # all-or-nothing, best-effort when false
+    atomic = serializers.BooleanField(default=True)
+
+
+class BookingBulkResultSerializer(serializers.Serializer):
+    """
+    Serializer for the per participant results of a bulk booking
+    """
+    participant = serializers.IntegerField(read_only=True)
+    booking_code = serializers.CharField(read_only=True, required=False)
+    error = serializers.CharField(read_only=True, required=False)
 
 
 class BookingRetrieveSerializer(serializers.ModelSerializer):
@@ -109,10 +262,35 @@ class BookingRetrieveSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+class WaitlistEntrySerializer(serializers.ModelSerializer):
+    """
+    Serializer for the waitlist entry of the requester
+    """
+    position = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = WaitlistEntry
+        fields = ('event', 'user', 'position', 'created_at')
+        read_only_fields = fields
+
+
+class SeatHoldSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the seat hold of the requester
+    """
+
+    class Meta:
+        model = SeatHold
+        fields = ('event', 'user', 'expires_at', 'created_at')
+        read_only_fields = fields
+
+
 class EventSummarySerializer(serializers.ModelSerializer):
     """
     Serializer for Event Summary View
+    expects the event annotated by EventQuerySet.with_summary()
     """
+    last_day_booked_seat_count = serializers.IntegerField(source='last_day_booking_count', read_only=True)
 
     class Meta:
         model = Event
@@ -128,7 +306,6 @@ class EventSummarySerializer(serializers.ModelSerializer):
             'end_date',
             'is_active',
             'organizer',
-            'participants',
             'created_at',
             'updated_at',
             'no_of_participants',
@@ -138,3 +315,23 @@ class EventSummarySerializer(serializers.ModelSerializer):
 
         )
 
+
+class BookingHistogramSerializer(serializers.Serializer):
+    """
+    Serializer for the per day booking count of an event
+    """
+    day = serializers.DateField(read_only=True)
+    count = serializers.IntegerField(read_only=True)
+
+
+class EventParticipantSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the participants of an event, one item per booking
+    """
+    username = serializers.CharField(source='participant.username', read_only=True)
+    email = serializers.EmailField(source='participant.email', read_only=True)
+
+    class Meta:
+        model = Booking
+        fields = ('participant', 'username', 'email', 'booking_code', 'booked_at')
+
@@ -0,0 +1,211 @@
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from events.cache import invalidate_event
+from events.models import Booking, Event, SeatHold, WaitlistEntry, generate_booking_code
+
+# per item errors of book_seats()
+NOT_OPEN = 'Event is not open for booking'
+UNKNOWN_PARTICIPANT = 'User does not exist'
+ALREADY_BOOKED = 'You have already booked this event'
+NO_SEAT_LEFT = 'No seat left'
+NOT_ENOUGH_SEATS = 'Not enough seats left for the group'
+GROUP_FAILED = 'Not booked, another participant of the group failed'
+
+
+def reserve_seats(event_id, quantity=1, now=None):
+    """
+    Reserve seats with one conditional UPDATE, the row lock taken by the UPDATE
+    serializes concurrent bookings so the event can never be oversold.
+    Returns True if the seats were reserved.
+    """
+    now = now or timezone.now()
+    reserved = Event.objects.open_for_booking(now).filter(
+        pk=event_id,
+        booked_count__lte=F('capacity') - F('held_count') - quantity,
+    ).update(booked_count=F('booked_count') + quantity, updated_at=now)
+    return bool(reserved)
+
+
+def move_held_seats(event_id, quantity, now):
+    """
+    Count held seats as booked, they are counted against the capacity already
+    so only the open state of the event is checked. Returns True if they were moved
+    """
+    moved = Event.objects.filter(
+        pk=event_id,
+        is_active=True,
+        window_start_date__lte=now,
+        window_end_date__gte=now,
+        held_count__gte=quantity,
+    ).update(held_count=F('held_count') - quantity, booked_count=F('booked_count') + quantity, updated_at=now)
+    return bool(moved)
+
+
+def claim_hold(event_id, participant_id, now=None):
+    """
+    Turn the live seat hold of the participant into a booked seat.
+    Returns True if the participant held a seat
+    """
+    now = now or timezone.now()
+    deleted, _ = SeatHold.objects.filter(event_id=event_id, user_id=participant_id, expires_at__gt=now).delete()
+    return bool(deleted) and move_held_seats(event_id, 1, now)
+
+
+def book_seat(event, participant):
+    """
+    Book a seat of the event for the participant, the seat held for them if any.
+    The seat reservation and the booking insert share one transaction,
+    so a failed insert (e.g. a second booking of the participant) gives the seat back.
+    """
+    with transaction.atomic():
+        if not (claim_hold(event.pk, participant.pk) or reserve_seats(event.pk)):
+            raise ValidationError(NOT_OPEN)
+
+        booking = Booking(event=event, participant=participant)
+        # the seat is already counted, tell the post_save counter to skip it
+        booking._seat_reserved = True
+        try:
+            booking.save()
+        except IntegrityError:
+            if Booking.objects.filter(event=event, participant=participant).exists():
+                raise ValidationError(ALREADY_BOOKED)
+            raise
+    return booking
+
+
+def book_seats(event_id, participant_ids, atomic=True, now=None):
+    """
+    Book a seat of the event for every participant, in a fixed number of queries
+    whatever the size of the group: the event row is locked, the seats are taken
+    with one guarded UPDATE and the bookings inserted with one bulk_create.
+    The participants holding a seat of the event book it, like with book_seat().
+
+    With ``atomic`` the group is booked entirely or not at all, otherwise
+    the participants are booked in order while seats last.
+    Returns one result per (distinct) participant, in order,
+    {'participant': id, 'booking_code': code} or {'participant': id, 'error': message}
+    """
+    now = now or timezone.now()
+    participant_ids = list(dict.fromkeys(participant_ids))
+    errors = {}
+
+    with transaction.atomic():
+        # the lock serializes the group with the concurrent bookings of the event,
+        # the checks below can't go stale before the insert
+        # not open_for_booking(), a sold-out event still books the seats held by the group
+        event = Event.objects.select_for_update().filter(
+            pk=event_id, is_active=True, window_start_date__lte=now, window_end_date__gte=now
+        ).first()
+        if event is None:
+            return [{'participant': participant_id, 'error': NOT_OPEN} for participant_id in participant_ids]
+
+        known_ids = set(get_user_model().objects.filter(pk__in=participant_ids).values_list('pk', flat=True))
+        booked_ids = set(Booking.objects.filter(
+            event_id=event_id, participant_id__in=participant_ids
+        ).values_list('participant_id', flat=True))
+        for participant_id in participant_ids:
+            if participant_id not in known_ids:
+                errors[participant_id] = UNKNOWN_PARTICIPANT
+            elif participant_id in booked_ids:
+                errors[participant_id] = ALREADY_BOOKED
+
+        candidates = [participant_id for participant_id in participant_ids if participant_id not in errors]
+        # the participants holding a seat book it, the others share the free seats.
+        # holds locked by the sweeper are being released, they don't count
+        held_ids = set(SeatHold.objects.select_for_update(skip_locked=True).filter(
+            event_id=event_id, user_id__in=candidates, expires_at__gt=now
+        ).values_list('user_id', flat=True))
+        unseated = [
+            participant_id for participant_id in candidates if participant_id not in held_ids
+        ][max(event.remaining_seat_count, 0):]
+        if atomic and unseated:
+            errors.update({participant_id: NOT_ENOUGH_SEATS for participant_id in candidates})
+        for participant_id in unseated:
+            errors.setdefault(participant_id, NO_SEAT_LEFT)
+
+        if atomic and errors:
+            return [
+                {'participant': participant_id, 'error': errors.get(participant_id, GROUP_FAILED)}
+                for participant_id in participant_ids
+            ]
+
+        bookings = [
+            Booking(event_id=event_id, participant_id=participant_id, booking_code=generate_booking_code())
+            for participant_id in participant_ids if participant_id not in errors
+        ]
+        if bookings:
+            claimed_ids = [booking.participant_id for booking in bookings if booking.participant_id in held_ids]
+            if claimed_ids:
+                SeatHold.objects.filter(event_id=event_id, user_id__in=claimed_ids).delete()
+            fresh_count = len(bookings) - len(claimed_ids)
+            if (claimed_ids and not move_held_seats(event_id, len(claimed_ids), now)) or \
+                    (fresh_count and not reserve_seats(event_id, fresh_count, now)):
+                # can't happen under the lock, unless the seat count drifted
+                raise ValidationError(NOT_ENOUGH_SEATS)
+            # no post_save, the seats are counted already
+            Booking.objects.bulk_create(bookings)
+            invalidate_event(event_id)
+
+    codes = {booking.participant_id: booking.booking_code for booking in bookings}
+    return [
+        {'participant': participant_id, 'booking_code': codes[participant_id]}
+        if participant_id in codes else {'participant': participant_id, 'error': errors[participant_id]}
+        for participant_id in participant_ids
+    ]
+
+
+def cancel_booking(booking_id):
+    """
+    Cancel (delete) the booking, Booking.delete() releases its seat
+    in the same transaction, then it's handed to the waitlist.
+    The row is locked first so concurrent cancellations of the same booking
+    release the seat once. Returns False if the booking was already gone
+    """
+    with transaction.atomic():
+        booking = Booking.objects.select_for_update().filter(pk=booking_id).first()
+        if booking is None:
+            return False
+        booking.delete()
+    return True
+
+
+def cancel_event(event_id):
+    """
+    Cancel the event and all its bookings, holds and waitlist at once:
+    one UPDATE of the event and one set-based DELETE per table, without
+    the per booking seat releases (the seat counters are reset in the same UPDATE,
+    nobody is promoted from the waitlist of a cancelled event).
+    Cancelling an event twice is a no-op. Returns the number of cancelled bookings,
+    None if the event does not exist
+    """
+    with transaction.atomic():
+        # the row lock of the UPDATE serializes with the bookings of the event,
+        # none can go through once it's inactive
+        if not Event.objects.filter(pk=event_id).update(
+            is_active=False, booked_count=0, held_count=0, updated_at=timezone.now()
+        ):
+            return None
+        cancelled = delete_event_rows(Booking, event_id)
+        delete_event_rows(SeatHold, event_id)
+        delete_event_rows(WaitlistEntry, event_id)
+    invalidate_event(event_id)
+    return cancelled
+
+
+def delete_event_rows(model, event_id):
+    """
+    DELETE the rows of the model for the event in one statement, no signals
+    and no cascade: nothing may reference these tables, a foreign key to
+    Booking (e.g. payments) would need its rows deleted first.
+    Returns the number of deleted rows
+    """
+    quote_name = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute('DELETE FROM {} WHERE {} = %s'.format(
+            quote_name(model._meta.db_table), quote_name(model._meta.get_field('event').column)
+        ), [event_id])
+        return cursor.rowcount
@@ -0,0 +1,142 @@
+"""
+Import and export of the event catalog.
+
+Rows are parsed one at a time from csv/ndjson lines, checked a batch at a time
+and inserted with one bulk_create per batch, each batch in its own transaction,
+so memory stays flat and a bad row only costs its batch a report line.
+"""
+import csv
+from collections import namedtuple
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from events.models import Event
+
+IMPORT_FIELDS = (
+    'title',
+    'short_description',
+    'long_description',
+    'start_date',
+    'end_date',
+    'window_start_date',
+    'window_end_date',
+    'capacity',
+    'is_active',
+)
+REQUIRED_FIELDS = ('title', 'short_description', 'start_date', 'end_date', 'window_start_date', 'window_end_date',
+                   'capacity')
+EXPORT_FIELDS = ('id',) + IMPORT_FIELDS + ('organizer', 'booked_count')
+
+DEFAULT_BATCH_SIZE = 1000
+
+ImportResult = namedtuple('ImportResult', ('created', 'errors'))
+
+
+def build_event(row, organizer):
+    """
+    Returns an unsaved Event of the row, converted by the model fields
+    raises ValidationError on a missing or malformed value
+    """
+    if not isinstance(row, dict):
+        raise ValidationError('Malformed row')
+    missing = [name for name in REQUIRED_FIELDS if row.get(name) in (None, '')]
+    if missing:
+        raise ValidationError('Missing {}'.format(', '.join(missing)))
+
+    values = {}
+    for name in IMPORT_FIELDS:
+        value = row.get(name)
+        if value in (None, ''):
+            continue
+        field = Event._meta.get_field(name)
+        try:
+            # converts and runs the validators too (max_length, min value, ...)
+            values[name] = field.clean(value, None)
+        except ValidationError as e:
+            raise ValidationError('{}: {}'.format(name, ' '.join(e.messages)))
+        # PositiveIntegerField leaves the sign to a database CHECK
+        if name == 'capacity' and values[name] < 0:
+            raise ValidationError('capacity: Ensure this value is greater than or equal to 0.')
+    return Event(organizer=organizer, **values)
+
+
+def check_dates(events):
+    """
+    Event.clean() for a whole batch, returns the message of each event with inverted dates by position
+    """
+    errors = {}
+    for position, event in enumerate(events):
+        if event.start_date > event.end_date:
+            errors[position] = 'Start date cannot be after end date'
+        elif event.window_start_date > event.window_end_date:
+            errors[position] = 'Window start date cannot be after window end date'
+    return errors
+
+
+def read_rows(rows, errors):
+    """
+    Yields the (row number, row) of the parsed rows, rows are numbered from 1.
+    A malformed csv row is reported in errors and skipped, text that isn't
+    utf-8 stops the reading there (the decoder can't resync), also reported
+    """
+    rows = iter(rows)
+    number = 0
+    while True:
+        number += 1
+        try:
+            row = next(rows)
+        except StopIteration:
+            return
+        except UnicodeDecodeError:
+            errors.append((number, 'Not valid UTF-8 text, the rows from here on were not read'))
+            return
+        except csv.Error as e:
+            errors.append((number, 'Malformed csv: {}'.format(e)))
+            continue
+        yield number, row
+
+
+def import_events(rows, organizer, batch_size=DEFAULT_BATCH_SIZE, dry_run=False):
+    """
+    Insert the events of the rows (dicts keyed by IMPORT_FIELDS), skipping the invalid ones,
+    the batches before an unreadable part of the file stay inserted.
+    Returns an ImportResult with the number of created events and
+    the (row number, message) of the skipped rows, rows are numbered from 1
+    """
+    created, errors = 0, []
+    rows = read_rows(rows, errors)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+
+        events, numbers = [], []
+        for number, row in batch:
+            try:
+                events.append(build_event(row, organizer))
+                numbers.append(number)
+            except ValidationError as e:
+                errors.append((number, ' '.join(e.messages)))
+
+        inverted = check_dates(events)
+        errors.extend((numbers[position], message) for position, message in inverted.items())
+        events = [event for position, event in enumerate(events) if position not in inverted]
+
+        if events and not dry_run:
+            with transaction.atomic():
+                # no batch_size, Django splits the INSERT on the backends limiting its parameters
+                Event.objects.bulk_create(events)
+        created += len(events)
+
+    errors.sort()
+    return ImportResult(created, errors)
+
+
+def export_rows(queryset=None, chunk_size=DEFAULT_BATCH_SIZE):
+    """
+    Rows of EXPORT_FIELDS from a server side cursor, the import format plus the ids
+    """
+    queryset = Event.objects.all() if queryset is None else queryset
+    return queryset.order_by('id').values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
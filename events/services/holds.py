@@ -0,0 +1,92 @@
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from events.cache import invalidate_event
+from events.models import Booking, Event, SeatHold
+from events.services.booking import ALREADY_BOOKED, NOT_OPEN
+from events.services.waitlist import promote_next
+
+ALREADY_HOLDING = 'You already hold a seat of this event'
+
+
+def hold_seat(event, user, now=None):
+    """
+    Hold a seat of the event for the user for SEAT_HOLD_TIMEOUT seconds,
+    the seat is taken with the same guarded UPDATE as a booking
+    """
+    now = now or timezone.now()
+    if Booking.objects.filter(event=event, participant=user).exists():
+        raise ValidationError(ALREADY_BOOKED)
+
+    try:
+        with transaction.atomic():
+            # an expired hold not swept yet would block the new one
+            release_holds(SeatHold.objects.filter(event=event, user=user, expires_at__lte=now))
+            held = Event.objects.open_for_booking(now).filter(pk=event.pk).update(
+                held_count=F('held_count') + 1, updated_at=now
+            )
+            if not held:
+                raise ValidationError(NOT_OPEN)
+            hold = SeatHold.objects.create(
+                event=event,
+                user=user,
+                expires_at=now + timezone.timedelta(seconds=settings.SEAT_HOLD_TIMEOUT),
+            )
+    except IntegrityError:
+        if SeatHold.objects.filter(event=event, user=user).exists():
+            raise ValidationError(ALREADY_HOLDING)
+        raise
+    invalidate_event(event.pk)
+    return hold
+
+
+def release_holds(holds, limit=None):
+    """
+    Delete the holds and give their seats back, must run in a transaction.
+    The rows are locked with SKIP LOCKED so a hold being booked (or swept
+    by another process) is left to it, and the seat counts stay exact.
+    The released seats go to the waitlist of the event, if any.
+    Returns the number of released holds per event id
+    """
+    rows = holds.select_for_update(skip_locked=True).values_list('pk', 'event_id')
+    if limit is not None:
+        rows = rows[:limit]
+    rows = list(rows)
+    if not rows:
+        return Counter()
+
+    SeatHold.objects.filter(pk__in=[pk for pk, _ in rows]).delete()
+    released = Counter(event_id for _, event_id in rows)
+    now = timezone.now()
+    for event_id, count in released.items():
+        Event.objects.filter(pk=event_id, held_count__gte=count).update(
+            held_count=F('held_count') - count, updated_at=now
+        )
+        invalidate_event(event_id)
+        transaction.on_commit(lambda event_id=event_id, count=count: promote_waitlist(event_id, count))
+    return released
+
+
+def promote_waitlist(event_id, seats):
+    """
+    Book up to ``seats`` released seats for the waitlist of the event
+    """
+    for _ in range(seats):
+        if promote_next(event_id) is None:
+            break
+
+
+def expire_seat_holds(batch_size=1000, now=None):
+    """
+    Release up to batch_size expired holds, oldest first, read off the expires_at index.
+    Returns the number of released holds
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        released = release_holds(SeatHold.objects.filter(expires_at__lte=now).order_by('expires_at'), batch_size)
+    return sum(released.values())
@@ -0,0 +1,63 @@
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from events.models import Booking, WaitlistEntry
+from events.services.booking import ALREADY_BOOKED, NOT_OPEN, reserve_seats
+
+SEATS_AVAILABLE = 'Seats are available, book the event instead'
+ALREADY_WAITING = 'You are already on the waitlist of this event'
+
+
+def join_waitlist(event, user, now=None):
+    """
+    Queue the user for a seat of the sold-out event, one INSERT per user
+    instead of booking attempts retried until a seat frees up
+    """
+    now = now or timezone.now()
+    if not (event.is_active and event.window_start_date <= now <= event.window_end_date):
+        raise ValidationError(NOT_OPEN)
+    if event.remaining_seat_count > 0:
+        raise ValidationError(SEATS_AVAILABLE)
+    if Booking.objects.filter(event=event, participant=user).exists():
+        raise ValidationError(ALREADY_BOOKED)
+
+    try:
+        with transaction.atomic():
+            return WaitlistEntry.objects.create(event=event, user=user)
+    except IntegrityError:
+        if WaitlistEntry.objects.filter(event=event, user=user).exists():
+            raise ValidationError(ALREADY_WAITING)
+        raise
+
+
+def promote_next(event_id, now=None):
+    """
+    Book the released seat of the event for the first user of its waitlist.
+
+    The head of the queue is locked with SKIP LOCKED, so concurrent promotions
+    (several seats released at once) take the next entries instead of waiting
+    on each other's lock. Users who booked the event meanwhile leave the queue,
+    the entry stays if the seat went to someone else first.
+    Returns the booking, or None if there was nobody to promote or no seat left.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        while True:
+            entry = WaitlistEntry.objects.select_for_update(skip_locked=True).filter(
+                event_id=event_id
+            ).order_by('id').first()
+            if entry is None:
+                return None
+            if not Booking.objects.filter(event_id=event_id, participant_id=entry.user_id).exists():
+                break
+            entry.delete()
+
+        if not reserve_seats(event_id, now=now):
+            return None
+        booking = Booking(event_id=event_id, participant_id=entry.user_id)
+        # the seat is already counted, see book_seat()
+        booking._seat_reserved = True
+        booking.save()
+        entry.delete()
+    return booking
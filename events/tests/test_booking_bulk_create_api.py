@@ -0,0 +1,137 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from model_bakery import baker
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from events.models import Booking, Event
+
+
+class BookingBulkCreateAPITestCase(APITestCase):
+    def setUp(self):
+        self.url = reverse('events:bookings-bulk')
+        self.admin = baker.make(get_user_model(), is_staff=True, is_superuser=True)
+        self.users = baker.make(get_user_model(), _quantity=3)
+        self.event = baker.make(
+            Event,
+            capacity=5,
+            window_start_date=timezone.now() - timezone.timedelta(days=1),
+            window_end_date=timezone.now() + timezone.timedelta(days=1),
+            start_date=timezone.now() + timezone.timedelta(days=4),
+            end_date=timezone.now() + timezone.timedelta(days=5),
+        )
+
+    def book(self, participants, **data):
+        return self.client.post(
+            self.url,
+            {'event': self.event.pk, 'participants': participants, **data},
+            format='json',
+        )
+
+    def assertBooked(self, participants):
+        self.event.refresh_from_db()
+        self.assertCountEqual(
+            Booking.objects.filter(event=self.event).values_list('participant', flat=True),
+            participants,
+        )
+        self.assertEqual(self.event.booked_count, len(participants))
+
+    def test_bulk_booking_books_every_participant(self):
+        self.client.force_authenticate(user=self.admin)
+        participant_ids = [user.pk for user in self.users]
+
+        response = self.book(participant_ids)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        results = response.data['results']
+        self.assertEqual([result['participant'] for result in results], participant_ids)
+        self.assertEqual(
+            {result['booking_code'] for result in results},
+            set(Booking.objects.values_list('booking_code', flat=True)),
+        )
+        self.assertBooked(participant_ids)
+
+    def test_bulk_booking_costs_the_same_queries_for_any_group_size(self):
+        self.client.force_authenticate(user=self.admin)
+        self.event.capacity = 20
+        self.event.save()
+
+        large_group_ids = [user.pk for user in baker.make(get_user_model(), _quantity=10)]
+
+        with CaptureQueriesContext(connection) as small_group:
+            self.book([self.users[0].pk])
+        with CaptureQueriesContext(connection) as large_group:
+            self.book(large_group_ids)
+
+        self.assertEqual(len(small_group), len(large_group))
+
+    def test_atomic_bulk_booking_books_nobody_on_a_failure(self):
+        self.client.force_authenticate(user=self.admin)
+        baker.make(Booking, event=self.event, participant=self.users[0])
+
+        unknown_id = max(user.pk for user in self.users) + 100
+
+        response = self.book([user.pk for user in self.users] + [unknown_id])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            [result['error'] for result in response.data['results']],
+            [
+                'You have already booked this event',
+                'Not booked, another participant of the group failed',
+                'Not booked, another participant of the group failed',
+                'User does not exist',
+            ],
+        )
+        self.assertBooked([self.users[0].pk])
+
+    def test_atomic_bulk_booking_fails_when_the_group_does_not_fit(self):
+        self.client.force_authenticate(user=self.admin)
+        self.event.capacity = 2
+        self.event.save()
+
+        response = self.book([user.pk for user in self.users])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            {result['error'] for result in response.data['results']},
+            {'Not enough seats left for the group'},
+        )
+        self.assertBooked([])
+
+    def test_best_effort_bulk_booking_books_while_seats_last(self):
+        self.client.force_authenticate(user=self.admin)
+        self.event.capacity = 2
+        self.event.save()
+        unknown_id = max(user.pk for user in self.users) + 100
+
+        response = self.book([unknown_id] + [user.pk for user in self.users], atomic=False)
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        results = response.data['results']
+        self.assertEqual(results[0]['error'], 'User does not exist')
+        self.assertIn('booking_code', results[1])
+        self.assertIn('booking_code', results[2])
+        self.assertEqual(results[3]['error'], 'No seat left')
+        self.assertBooked([self.users[0].pk, self.users[1].pk])
+
+    def test_bulk_booking_of_closed_event_fails(self):
+        self.client.force_authenticate(user=self.admin)
+        self.event.is_active = False
+        self.event.save()
+
+        response = self.book([user.pk for user in self.users], atomic=False)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertBooked([])
+
+    def test_bulk_booking_is_for_admins_only(self):
+        self.client.force_authenticate(user=self.users[0])
+
+        response = self.book([user.pk for user in self.users])
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertBooked([])
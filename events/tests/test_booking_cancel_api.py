@@ -0,0 +1,66 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from model_bakery import baker
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from events.models import Booking, Event
+
+
+class BookingCancelAPITestCase(APITestCase):
+    def setUp(self):
+        self.user = baker.make(get_user_model(), is_staff=False, is_superuser=False)
+        self.admin_user = baker.make(get_user_model(), is_staff=True, is_superuser=True)
+        self.event = baker.make(
+            Event,
+            capacity=2,
+            window_start_date=timezone.now() - timezone.timedelta(days=1),
+            window_end_date=timezone.now() + timezone.timedelta(days=1),
+            start_date=timezone.now() + timezone.timedelta(days=4),
+            end_date=timezone.now() + timezone.timedelta(days=5),
+        )
+        self.booking = baker.make(Booking, event=self.event, participant=self.user)
+        self.url = reverse('events:booking', args=[self.booking.pk])
+
+    def test_owner_cancels_booking(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.delete(self.url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.booked_count, 0)
+        self.assertFalse(Booking.objects.exists())
+
+        # the seat is not released twice
+        response = self.client.delete(self.url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.booked_count, 0)
+
+    def test_cancel_booking_of_another_user_fails(self):
+        self.client.force_authenticate(user=baker.make(get_user_model(), is_staff=False, is_superuser=False))
+        response = self.client.delete(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertTrue(Booking.objects.exists())
+
+    def test_admin_cancels_event(self):
+        baker.make(Booking, event=self.event)
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.post(reverse('events:event-cancel', args=[self.event.pk]))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'event': self.event.pk, 'cancelled_bookings': 2})
+        self.event.refresh_from_db()
+        self.assertFalse(self.event.is_active)
+        self.assertEqual(self.event.booked_count, 0)
+        self.assertFalse(Booking.objects.exists())
+
+    def test_cancel_event_fails_for_user_role_and_unknown_event(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(reverse('events:event-cancel', args=[self.event.pk]))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.post(reverse('events:event-cancel', args=[self.event.pk + 1]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -50,17 +50,75 @@ class BookingListCreateAPITestCase(APITestCase):
         response = self.client.post(self.url, self.data)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def make_events(self, quantity):
+        """
+        A user books an event once, bookings of the same user need several events
+        """
+        return baker.make(
+            Event,
+            _quantity=quantity,
+            window_start_date=timezone.now() - timedelta(days=1),
+            window_end_date=timezone.now() + timedelta(days=2),
+            start_date=timezone.now() + timedelta(days=3),
+            end_date=timezone.now() + timedelta(days=4),
+        )
+
     def test_booking_list_api_success(self):
         """
         Test that authenticated user can create a booking
         """
         self.client.force_authenticate(user=self.user)
 
-        baker.make(Booking, event=self.event, participant=self.user, _quantity=4)
+        events = self.make_events(4)
+        baker.make(Booking, event=iter(events), participant=self.user, _quantity=4)
 
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertListEqual(
-            list(Booking.objects.all().values_list('event', flat=True)),
-            [self.event.id] * 4
+        self.assertCountEqual(
+            [booking['event'] for booking in response.data['results']],
+            [event.id for event in events]
+        )
+
+    def test_booking_list_api_is_paginated_newest_first(self):
+        """
+        Test that the bookings are served page by page, newest first
+        """
+        self.client.force_authenticate(user=self.user)
+        bookings = baker.make(Booking, event=iter(self.make_events(3)), participant=self.user, _quantity=3)
+        # someone else's booking should not be listed
+        baker.make(Booking, event=self.event)
+
+        response = self.client.get(self.url, {'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first_page = [booking['id'] for booking in response.data['results']]
+
+        response = self.client.get(response.data['next'])
+        self.assertIsNone(response.data['next'])
+        second_page = [booking['id'] for booking in response.data['results']]
+
+        self.assertEqual(first_page + second_page, [booking.id for booking in reversed(bookings)])
+
+    def test_booking_list_api_expand_event_uses_a_single_query(self):
+        """
+        Test that ?expand=event inlines the events joined in the page query
+        """
+        self.client.force_authenticate(user=self.user)
+        other_event = baker.make(
+            Event,
+            window_start_date=timezone.now() - timedelta(days=1),
+            window_end_date=timezone.now() + timedelta(days=2),
+            start_date=timezone.now() + timedelta(days=3),
+            end_date=timezone.now() + timedelta(days=4),
+        )
+        baker.make(Booking, event=self.event, participant=self.user)
+        baker.make(Booking, event=other_event, participant=self.user)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {'expand': 'event'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [booking['event']['id'] for booking in response.data['results']],
+            [other_event.id, self.event.id]
         )
+        self.assertEqual(response.data['results'][0]['event']['title'], other_event.title)
@@ -1,6 +1,8 @@
 from datetime import timedelta
+from unittest import mock
 
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError
 from django.test import TestCase
 from django.utils import timezone
 from model_bakery import baker
@@ -53,3 +55,48 @@ class BookingModelTest(TestCase):
         booking = baker.make('events.Booking', participant=self.user1, event=self.event)
         self.assertTrue(booking.booking_code)
 
+    def test_booking_is_created_with_a_single_insert(self):
+        """
+        Test that the booking code is there right after the INSERT, no second UPDATE
+        """
+        booking = Booking(participant=self.user1, event=self.event)
+        with self.assertNumQueries(4):
+            # savepoint, INSERT, booked_count UPDATE, release savepoint
+            booking.save()
+
+        self.assertEqual(len(booking.booking_code), 13)
+        self.assertEqual(Booking.objects.get(pk=booking.pk).booking_code, booking.booking_code)
+
+    def test_booking_codes_are_generated_for_bulk_added_participants(self):
+        """
+        Test that event.participants.add() gets distinct codes too
+        """
+        self.event.participants.add(self.user1, self.user2)
+        codes = list(Booking.objects.values_list('booking_code', flat=True))
+        self.assertEqual(len(set(codes)), 2)
+        self.assertTrue(all(codes))
+
+    def test_booking_code_collision_is_retried(self):
+        """
+        Test that a colliding booking code is replaced by a fresh one
+        """
+        existing = baker.make('events.Booking', participant=self.user1, event=self.event)
+        with mock.patch(
+            'events.models.generate_booking_code',
+            side_effect=[existing.booking_code, 'FRESHCODE'],
+        ):
+            booking = baker.make('events.Booking', participant=self.user2, event=self.event, booking_code='')
+
+        self.assertEqual(booking.booking_code, 'FRESHCODE')
+        self.assertEqual(Booking.objects.count(), 2)
+
+    def test_booking_code_collision_gives_up_after_max_attempts(self):
+        """
+        Test that the retry is bounded
+        """
+        existing = baker.make('events.Booking', participant=self.user1, event=self.event)
+        with mock.patch('events.models.generate_booking_code', return_value=existing.booking_code):
+            with self.assertRaises(IntegrityError):
+                baker.make('events.Booking', participant=self.user2, event=self.event, booking_code='')
+
+        self.assertEqual(Booking.objects.count(), 1)
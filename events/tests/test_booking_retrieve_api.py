@@ -55,6 +55,18 @@ class BookingRetrieveAPITestCase(APITestCase):
         response = self.client.get(self.url, {'event': self.event.id})
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
+    def test_booking_retrieve_api_permission_check_does_not_load_the_participant(self):
+        """
+        Test that the ownership check compares the participant id, only the booking is fetched
+        """
+        baker.make(
+            Booking,
+            event=self.event,
+            participant=self.user
+        )
+        self.client.force_authenticate(user=self.user)
 
-
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
 
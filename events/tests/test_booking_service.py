@@ -0,0 +1,172 @@
+import threading
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from model_bakery import baker
+
+from events.models import Booking, Event, SeatHold, WaitlistEntry
+from events.services.booking import book_seat, cancel_booking, cancel_event
+
+
+class BookSeatTest(TestCase):
+    """
+    Test the booking service
+    """
+    def setUp(self) -> None:
+        self.user = baker.make(get_user_model())
+        self.event = baker.make(
+            Event,
+            capacity=1,
+            window_start_date=timezone.now() - timezone.timedelta(days=1),
+            window_end_date=timezone.now() + timezone.timedelta(days=1),
+        )
+
+    def test_book_seat_creates_booking_and_counts_it_once(self):
+        booking = book_seat(self.event, self.user)
+
+        self.event.refresh_from_db()
+        self.assertEqual(booking.participant, self.user)
+        self.assertEqual(self.event.booked_count, 1)
+        self.assertEqual(Booking.objects.filter(event=self.event).count(), 1)
+
+    def test_book_seat_fails_for_full_event(self):
+        book_seat(self.event, self.user)
+
+        with self.assertRaises(ValidationError):
+            book_seat(self.event, baker.make(get_user_model()))
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.booked_count, 1)
+        self.assertEqual(Booking.objects.filter(event=self.event).count(), 1)
+
+    def test_book_seat_fails_for_second_booking_of_participant(self):
+        self.event.capacity = 2
+        self.event.save()
+        book_seat(self.event, self.user)
+
+        with self.assertRaisesMessage(ValidationError, 'You have already booked this event'):
+            book_seat(self.event, self.user)
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.booked_count, 1)
+        self.assertEqual(Booking.objects.filter(event=self.event).count(), 1)
+
+    def test_book_seat_fails_for_closed_window(self):
+        self.event.window_start_date = timezone.now() - timezone.timedelta(days=5)
+        self.event.window_end_date = timezone.now() - timezone.timedelta(days=4)
+        self.event.save()
+
+        with self.assertRaises(ValidationError):
+            book_seat(self.event, self.user)
+        self.assertFalse(Booking.objects.exists())
+
+    def test_book_seat_fails_for_inactive_event(self):
+        self.event.is_active = False
+        self.event.save()
+
+        with self.assertRaises(ValidationError):
+            book_seat(self.event, self.user)
+        self.assertFalse(Booking.objects.exists())
+
+
+class CancelBookingTest(TestCase):
+    """
+    Test the cancellation of bookings and events
+    """
+    def setUp(self) -> None:
+        self.users = baker.make(get_user_model(), _quantity=3)
+        self.event = baker.make(
+            Event,
+            capacity=3,
+            window_start_date=timezone.now() - timezone.timedelta(days=1),
+            window_end_date=timezone.now() + timezone.timedelta(days=1),
+        )
+
+    def test_cancel_booking_releases_the_seat_once(self):
+        booking = book_seat(self.event, self.users[0])
+        book_seat(self.event, self.users[1])
+
+        self.assertTrue(cancel_booking(booking.pk))
+        self.assertFalse(cancel_booking(booking.pk))
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.booked_count, 1)
+        self.assertFalse(Booking.objects.filter(pk=booking.pk).exists())
+
+    def test_cancel_event_in_set_based_queries(self):
+        for user in self.users[:2]:
+            book_seat(self.event, user)
+        baker.make(SeatHold, event=self.event, user=self.users[2], expires_at=timezone.now())
+        baker.make(WaitlistEntry, event=self.event, user=self.users[2])
+        other_booking = baker.make(Booking, event=baker.make(
+            Event,
+            window_start_date=timezone.now() - timezone.timedelta(days=1),
+            window_end_date=timezone.now() + timezone.timedelta(days=1),
+        ))
+
+        # savepoint, one UPDATE and one DELETE per table, whatever the number of bookings
+        with self.assertNumQueries(6):
+            self.assertEqual(cancel_event(self.event.pk), 2)
+
+        self.event.refresh_from_db()
+        self.assertFalse(self.event.is_active)
+        self.assertEqual((self.event.booked_count, self.event.held_count), (0, 0))
+        self.assertEqual(list(Booking.objects.all()), [other_booking])
+        self.assertFalse(SeatHold.objects.exists())
+        self.assertFalse(WaitlistEntry.objects.exists())
+
+        self.assertEqual(cancel_event(self.event.pk), 0)
+        self.assertIsNone(cancel_event(self.event.pk + 100))
+
+
+class ConcurrentBookingTest(TransactionTestCase):
+    """
+    Fire many parallel bookings at a small capacity event, it must never be oversold
+    """
+    capacity = 5
+    no_of_requests = 30
+
+    def setUp(self) -> None:
+        self.users = baker.make(get_user_model(), _quantity=self.no_of_requests)
+        self.event = baker.make(
+            Event,
+            capacity=self.capacity,
+            window_start_date=timezone.now() - timezone.timedelta(days=1),
+            window_end_date=timezone.now() + timezone.timedelta(days=1),
+        )
+
+    def test_parallel_bookings_never_oversell(self):
+        barrier = threading.Barrier(self.no_of_requests)
+        results = []
+
+        def book(user):
+            try:
+                barrier.wait()
+                book_seat(self.event, user)
+                results.append(True)
+            except (ValidationError, OperationalError):
+                # sold out, or sqlite refusing a concurrent writer
+                results.append(False)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=book, args=(user,)) for user in self.users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.event.refresh_from_db()
+        no_of_bookings = Booking.objects.filter(event=self.event).count()
+        self.assertEqual(len(results), self.no_of_requests)
+        self.assertLessEqual(no_of_bookings, self.capacity)
+        self.assertEqual(self.event.booked_count, no_of_bookings)
+        self.assertEqual(results.count(True), no_of_bookings)
+        # a backend failing every writer would pass the checks above
+        self.assertGreaterEqual(no_of_bookings, 1)
+        if connection.vendor == 'postgresql':
+            # every seat is sold once the dust settles
+            self.assertEqual(no_of_bookings, self.capacity)
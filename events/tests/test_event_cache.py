@@ -0,0 +1,138 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from model_bakery import baker
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from events import cache as events_cache
+from events.cache import bump_catalog_version, get_versions, invalidate_event
+from events.models import Booking, Event
+from events.serializers import EventListSerializer
+
+
+class EventCacheTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = baker.make(get_user_model(), is_staff=False, is_superuser=False)
+        self.admin = baker.make(get_user_model(), is_staff=True, is_superuser=True)
+        self.event = baker.make(
+            Event,
+            capacity=10,
+            window_start_date=timezone.now() - timezone.timedelta(days=1),
+            window_end_date=timezone.now() + timezone.timedelta(days=1),
+            start_date=timezone.now() + timezone.timedelta(days=2),
+            end_date=timezone.now() + timezone.timedelta(days=3),
+        )
+        self.url = reverse('events:event', args=[self.event.pk])
+        self.list_url = reverse('events:events')
+        self.stats_url = reverse('events:cache-stats')
+
+    def test_cached_event_detail_is_served_without_query(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            cached_response = self.client.get(self.url)
+        self.assertEqual(cached_response.data, response.data)
+
+    def test_admin_and_user_representations_are_cached_apart(self):
+        self.client.force_authenticate(user=self.admin)
+        self.assertIn('participants', self.client.get(self.url).data)
+
+        self.client.force_authenticate(user=self.user)
+        self.assertNotIn('participants', self.client.get(self.url).data)
+
+    def test_event_update_invalidates_the_cache(self):
+        self.client.force_authenticate(user=self.user)
+        self.client.get(self.url)
+
+        self.event.title = 'New title'
+        self.event.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['title'], 'New title')
+
+    def test_booking_invalidates_the_cache(self):
+        self.client.force_authenticate(user=self.user)
+        self.client.get(self.url)
+        self.client.get(self.list_url)
+
+        booking = baker.make(Booking, event=self.event)
+        self.assertEqual(self.client.get(self.url).data['booked_count'], 1)
+        self.assertEqual(self.client.get(self.list_url).data['results'][0]['booked_count'], 1)
+
+        booking.delete()
+        self.assertEqual(self.client.get(self.url).data['booked_count'], 0)
+
+    def test_late_write_does_not_outlive_the_invalidation(self):
+        self.client.force_authenticate(user=self.user)
+        versions = get_versions([self.event.pk])
+        stale = dict(self.client.get(self.url).data, title='Stale title')
+
+        # a slow request read the event before the change, and caches it after
+        Event.objects.filter(pk=self.event.pk).update(title='New title')
+        invalidate_event(self.event.pk)
+        events_cache.set_many('retrieve', {self.event.pk: stale}, versions)
+
+        self.assertEqual(self.client.get(self.url).data['title'], 'New title')
+
+    def test_late_list_write_does_not_outlive_the_change(self):
+        self.client.force_authenticate(user=self.user)
+        stale_event = Event.objects.get(pk=self.event.pk)
+
+        baker.make(Booking, event=self.event)
+        # serialized from the row read before the booking
+        EventListSerializer([stale_event], many=True, context={}).data
+
+        self.assertEqual(self.client.get(self.list_url).data['results'][0]['booked_count'], 1)
+
+    def test_expanded_bookings_cache_their_events_at_once(self):
+        other_event = baker.make(
+            Event,
+            window_start_date=timezone.now() - timezone.timedelta(days=1),
+            window_end_date=timezone.now() + timezone.timedelta(days=1),
+        )
+        baker.make(Booking, event=self.event, participant=self.user)
+        baker.make(Booking, event=other_event, participant=self.user)
+        self.client.force_authenticate(user=self.user)
+        url = reverse('events:bookings')
+
+        with mock.patch.object(events_cache, 'set_many', wraps=events_cache.set_many) as set_many:
+            response = self.client.get(url, {'expand': 'event'})
+        set_many.assert_called_once()
+        self.assertEqual(
+            [booking['event']['id'] for booking in response.data['results']], [other_event.pk, self.event.pk]
+        )
+
+        with self.assertNumQueries(1):
+            cached_response = self.client.get(url, {'expand': 'event'})
+        self.assertEqual(cached_response.data, response.data)
+
+    def test_catalog_version_bump_retires_every_entry(self):
+        self.client.force_authenticate(user=self.user)
+        self.client.get(self.url)
+
+        # bypasses the signals
+        Event.objects.filter(pk=self.event.pk).update(title='New title')
+        bump_catalog_version()
+
+        self.assertEqual(self.client.get(self.url).data['title'], 'New title')
+
+    def test_cache_stats_api_counts_hits_and_misses(self):
+        self.client.force_authenticate(user=self.user)
+        self.client.get(self.list_url)
+        self.client.get(self.list_url)
+
+        response = self.client.get(self.stats_url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(self.stats_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['hits'], 1)
+        self.assertEqual(response.data['misses'], 1)
@@ -0,0 +1,125 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from model_bakery import baker
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from events.models import Booking, Event
+
+
+class EventConditionalGetTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = baker.make(get_user_model(), is_staff=False, is_superuser=False)
+        self.admin = baker.make(get_user_model(), is_staff=True, is_superuser=True)
+        self.event = baker.make(
+            Event,
+            window_start_date=timezone.now() - timezone.timedelta(days=1),
+            window_end_date=timezone.now() + timezone.timedelta(days=1),
+            start_date=timezone.now() + timezone.timedelta(days=2),
+            end_date=timezone.now() + timezone.timedelta(days=3),
+        )
+        self.url = reverse('events:event', args=[self.event.pk])
+        self.list_url = reverse('events:events')
+        self.summary_url = reverse('events:summary', args=[self.event.pk])
+
+    def test_event_detail_answers_not_modified(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Last-Modified', response)
+
+        # served from the cached representation, no query at all
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertIn('ETag', response)
+
+    def test_event_detail_if_modified_since(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.url)
+
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_event_detail_booking_changes_the_etag(self):
+        self.client.force_authenticate(user=self.user)
+        etag = self.client.get(self.url)['ETag']
+
+        baker.make(Booking, event=self.event)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['booked_count'], 1)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_event_detail_etag_differs_per_user(self):
+        self.client.force_authenticate(user=self.user)
+        etag = self.client.get(self.url)['ETag']
+
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_event_list_answers_not_modified_without_serializing(self):
+        self.client.force_authenticate(user=self.user)
+        etag = self.client.get(self.list_url)['ETag']
+
+        # only the fingerprint aggregate runs
+        with self.assertNumQueries(1):
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_event_list_new_or_deleted_event_changes_the_etag(self):
+        self.client.force_authenticate(user=self.user)
+        etag = self.client.get(self.list_url)['ETag']
+
+        other_event = baker.make(
+            Event,
+            window_start_date=timezone.now() - timezone.timedelta(days=1),
+            window_end_date=timezone.now() + timezone.timedelta(days=1),
+        )
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        etag = response['ETag']
+        other_event.delete()
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_event_summary_answers_not_modified(self):
+        self.client.force_authenticate(user=self.admin)
+        etag = self.client.get(self.summary_url)['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.summary_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        baker.make(Booking, event=self.event)
+        response = self.client.get(self.summary_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['no_of_participants'], 1)
+
+    def test_event_summary_changes_when_the_window_closes(self):
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(self.summary_url)
+        self.assertTrue(response.data['is_open_for_booking'])
+        etag, last_modified = response['ETag'], response['Last-Modified']
+
+        later = self.event.window_end_date + timezone.timedelta(hours=1)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            response = self.client.get(self.summary_url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertFalse(response.data['is_open_for_booking'])
+
+            response = self.client.get(self.summary_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_unknown_event_is_not_found(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse('events:event', args=[self.event.pk + 100]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
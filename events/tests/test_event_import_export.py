@@ -0,0 +1,175 @@
+import codecs
+import csv
+import io
+import json
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from model_bakery import baker
+
+from core.streaming import read_csv, read_ndjson
+from events.models import Event
+from events.services.catalog import IMPORT_FIELDS, import_events
+
+
+def make_row(**kwargs):
+    row = {
+        'title': 'Event',
+        'short_description': 'Short',
+        'long_description': 'Long',
+        'start_date': '2030-01-10 10:00:00',
+        'end_date': '2030-01-10 12:00:00',
+        'window_start_date': '2030-01-01 00:00:00',
+        'window_end_date': '2030-01-09 00:00:00',
+        'capacity': '10',
+        'is_active': 'True',
+    }
+    row.update(kwargs)
+    return row
+
+
+def to_csv(rows):
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=IMPORT_FIELDS)
+    writer.writeheader()
+    writer.writerows(rows)
+    return output.getvalue()
+
+
+class ImportEventsServiceTestCase(TestCase):
+    """
+    Test events.services.catalog.import_events
+    """
+    def setUp(self):
+        self.organizer = baker.make(get_user_model(), is_staff=True, is_superuser=True)
+
+    def test_valid_rows_are_created_in_batches(self):
+        rows = [make_row(title='Event {}'.format(i)) for i in range(5)]
+        # one INSERT per batch of two, each in its own savepoint
+        with self.assertNumQueries(9):
+            result = import_events(rows, self.organizer, batch_size=2)
+
+        self.assertEqual(result, (5, []))
+        self.assertEqual(
+            list(Event.objects.order_by('id').values_list('title', flat=True)),
+            ['Event {}'.format(i) for i in range(5)],
+        )
+        self.assertEqual(Event.objects.filter(organizer=self.organizer, capacity=10).count(), 5)
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        rows = [
+            make_row(title='Valid'),
+            make_row(start_date='not a date'),
+            make_row(title=''),
+            make_row(start_date='2030-01-11 10:00:00'),
+            make_row(window_start_date='2030-01-09 10:00:00'),
+            make_row(capacity='-1'),
+            None,
+            make_row(title='x' * 300),
+        ]
+        result = import_events(rows, self.organizer, batch_size=3)
+
+        self.assertEqual(result.created, 1)
+        self.assertEqual([number for number, _ in result.errors], [2, 3, 4, 5, 6, 7, 8])
+        self.assertIn('start_date', result.errors[0][1])
+        self.assertEqual(result.errors[1][1], 'Missing title')
+        self.assertEqual(result.errors[2][1], 'Start date cannot be after end date')
+        self.assertEqual(result.errors[3][1], 'Window start date cannot be after window end date')
+        self.assertIn('capacity', result.errors[4][1])
+        self.assertEqual(result.errors[6][1], 'title: Ensure this value has at most 255 characters (it has 300).')
+        self.assertEqual(list(Event.objects.values_list('title', flat=True)), ['Valid'])
+
+    def test_unreadable_text_stops_the_import(self):
+        content = to_csv([make_row(title='First'), make_row(title='Second')]).encode() + b'\xff\xfe,\n'
+        lines = codecs.iterdecode(io.BytesIO(content), 'utf-8-sig')
+        result = import_events(read_csv(lines), self.organizer, batch_size=1)
+
+        self.assertEqual(result.created, 2)
+        self.assertEqual(result.errors, [(3, 'Not valid UTF-8 text, the rows from here on were not read')])
+        self.assertEqual(Event.objects.count(), 2)
+
+    def test_malformed_csv_row_is_skipped(self):
+        content = to_csv([make_row(title='x' * (csv.field_size_limit() + 1)), make_row(title='Valid')])
+        result = import_events(read_csv(io.StringIO(content)), self.organizer)
+
+        self.assertEqual(result.created, 1)
+        self.assertEqual(result.errors[0][0], 1)
+        self.assertIn('Malformed csv', result.errors[0][1])
+
+    def test_dry_run_does_not_insert(self):
+        with self.assertNumQueries(0):
+            result = import_events([make_row(), make_row()], self.organizer, dry_run=True)
+        self.assertEqual(result.created, 2)
+        self.assertFalse(Event.objects.exists())
+
+    def test_readers_parse_line_by_line(self):
+        rows = [make_row(title='First'), make_row(title='Second')]
+        self.assertEqual([row['title'] for row in read_csv(io.StringIO(to_csv(rows)))], ['First', 'Second'])
+
+        lines = [json.dumps(rows[0]) + '\n', '\n', '{broken\n', json.dumps(rows[1]) + '\n']
+        self.assertEqual(
+            [row and row['title'] for row in read_ndjson(lines)], ['First', None, 'Second']
+        )
+
+
+class ImportExportEventsCommandTestCase(TestCase):
+    """
+    Test the import_events and export_events management commands
+    """
+    def setUp(self):
+        self.organizer = baker.make(get_user_model(), username='organizer', is_staff=True, is_superuser=True)
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8-sig') as file:
+            file.write(content)
+        return path
+
+    def test_import_csv(self):
+        path = self.write('events.csv', to_csv([make_row(title='Valid'), make_row(capacity='many')]))
+        out, err = io.StringIO(), io.StringIO()
+        call_command('import_events', path, organizer='organizer', stdout=out, stderr=err)
+
+        self.assertEqual(list(Event.objects.values_list('title', flat=True)), ['Valid'])
+        self.assertIn('Imported 1 event(s), skipped 1 row(s)', out.getvalue())
+        self.assertIn('Row 2: capacity', err.getvalue())
+
+    def test_import_ndjson_dry_run(self):
+        path = self.write('events.json', json.dumps(make_row()) + '\n')
+        out = io.StringIO()
+        call_command('import_events', path, format='ndjson', organizer='organizer', dry_run=True, stdout=out)
+
+        self.assertFalse(Event.objects.exists())
+        self.assertIn('Validated 1 event(s)', out.getvalue())
+
+    def test_import_rejects_unknown_format_and_organizer(self):
+        path = self.write('events.txt', '')
+        with self.assertRaises(CommandError):
+            call_command('import_events', path, organizer='organizer')
+        with self.assertRaises(CommandError):
+            call_command('import_events', path, format='csv', organizer='nobody')
+
+    def test_export_round_trips_through_import(self):
+        import_events([make_row(title='Event {}'.format(i)) for i in range(3)], self.organizer)
+
+        for file_format in ('csv', 'ndjson'):
+            path = os.path.join(self.directory.name, 'export.{}'.format(file_format))
+            call_command('export_events', format=file_format, output=path, stdout=io.StringIO())
+
+            out = io.StringIO()
+            call_command('import_events', path, organizer='organizer', dry_run=True, stdout=out, stderr=out)
+            self.assertIn('Validated 3 event(s), skipped 0 row(s)', out.getvalue())
+
+    def test_export_to_stdout(self):
+        event = baker.make(Event, organizer=self.organizer)
+        out = io.StringIO()
+        call_command('export_events', format='ndjson', stdout=out)
+
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([(row['id'], row['title']) for row in rows], [(event.pk, event.title)])
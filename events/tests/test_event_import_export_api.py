@@ -0,0 +1,98 @@
+import csv
+import io
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from model_bakery import baker
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from events.models import Event
+from events.tests.test_event_import_export import make_row, to_csv
+
+
+class EventImportExportAPITestCase(APITestCase):
+    def setUp(self):
+        self.user = baker.make(get_user_model(), is_staff=False, is_superuser=False)
+        self.admin_user = baker.make(get_user_model(), is_staff=True, is_superuser=True)
+        self.import_url = reverse('events:events-import')
+        self.export_url = reverse('events:events-export')
+
+    def upload(self, name, content, **data):
+        if isinstance(content, str):
+            content = content.encode()
+        data['file'] = SimpleUploadedFile(name, content)
+        return self.client.post(self.import_url, data, format='multipart')
+
+    def test_import_fails_for_user_role(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.upload('events.csv', to_csv([make_row()]))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Event.objects.exists())
+
+    def test_import_csv(self):
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.upload('events.csv', to_csv([make_row(), make_row()]))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data, {'created': 2, 'errors': []})
+        self.assertEqual(Event.objects.filter(organizer=self.admin_user).count(), 2)
+
+    def test_import_ndjson_with_invalid_rows(self):
+        self.client.force_authenticate(user=self.admin_user)
+        content = json.dumps(make_row()) + '\n' + json.dumps(make_row(end_date='2030-01-01 00:00:00')) + '\n'
+        response = self.upload('events.txt', content, file_format='ndjson')
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(response.data['errors'], [{'row': 2, 'error': 'Start date cannot be after end date'}])
+
+    def test_import_all_invalid_or_unknown_format(self):
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.upload('events.csv', to_csv([make_row(title='')]))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['created'], 0)
+
+        response = self.upload('events.txt', to_csv([make_row()]))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('file_format', response.data)
+        self.assertFalse(Event.objects.exists())
+
+    def test_import_stops_at_text_that_is_not_utf8(self):
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.upload('events.csv', to_csv([make_row()]).encode() + 'Événement'.encode('latin-1'))
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(response.data['errors'][0]['row'], 2)
+        self.assertEqual(Event.objects.count(), 1)
+
+    def test_import_dry_run(self):
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.upload('events.csv', to_csv([make_row()]), dry_run=True)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 1)
+        self.assertFalse(Event.objects.exists())
+
+    def test_export_fails_for_user_role(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.export_url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_export_csv_streams_every_event(self):
+        events = baker.make(Event, _quantity=3)
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get(self.export_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual([int(row['id']) for row in rows], [event.pk for event in events])
+        self.assertEqual(rows[0]['title'], events[0].title)
+
+    def test_export_rejects_unknown_format(self):
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get(self.export_url, {'file_format': 'xml'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -96,7 +96,7 @@ class EventListCreateAPITestCase(APITestCase):
 
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 5)
+        self.assertEqual(len(response.data['results']), 5)
 
     def test_authenticated_user_can_see_registered_events(self):
         """
@@ -126,7 +126,24 @@ class EventListCreateAPITestCase(APITestCase):
         response = self.client.get(self.url + '?registered=true')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         # should only show 5 events which s/he is registered for not the other 5
-        self.assertEqual(len(response.data), 5)
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_registered_events_are_listed_once(self):
+        """
+        Test that registered=true lists every event once, whoever else booked it
+        """
+        events = baker.make(
+            'events.Event',
+            _quantity=3,
+            participants=[self.user, self.admin],
+            window_start_date=timezone.now() - timezone.timedelta(days=1),
+            window_end_date=timezone.now() + timezone.timedelta(days=5)
+        )
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.url, {'registered': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertCountEqual([event['id'] for event in response.data['results']], [event.id for event in events])
 
     def test_authenticated_user_can_see_unregistered_events(self):
         """
@@ -155,25 +172,83 @@ class EventListCreateAPITestCase(APITestCase):
         self.client.force_authenticate(user=self.user)
         response = self.client.get(self.url + '?registered=false')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 10)
+        self.assertEqual(len(response.data['results']), 10)
 
         self.client.force_authenticate(user=self.user)
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         # should see all events
-        self.assertEqual(len(response.data), 10)
-
-
-
-
-
-
-
+        self.assertEqual(len(response.data['results']), 10)
 
+    def test_event_list_open_for_booking(self):
+        """
+        Test that ?open=true lists the bookable events only, filtered in the page query
+        """
+        self.client.force_authenticate(user=self.user)
+        open_window = {
+            'window_start_date': timezone.now() - timezone.timedelta(days=1),
+            'window_end_date': timezone.now() + timezone.timedelta(days=5),
+            'start_date': timezone.now() + timezone.timedelta(days=10),
+            'end_date': timezone.now() + timezone.timedelta(days=15),
+        }
+        open_event = baker.make('events.Event', capacity=5, **open_window)
+        full_event = baker.make('events.Event', capacity=1, **open_window)
+        full_event.participants.add(self.admin)
+        baker.make('events.Event', capacity=5, is_active=False, **open_window)
+        baker.make(
+            'events.Event',
+            capacity=5,
+            window_start_date=timezone.now() + timezone.timedelta(days=1),
+            window_end_date=timezone.now() + timezone.timedelta(days=5),
+        )
 
+        # the validators and the page
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {'open': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([event['id'] for event in response.data['results']], [open_event.id])
 
+        response = self.client.get(self.url, {'open': 'false'})
+        self.assertEqual(len(response.data['results']), 4)
 
+    def test_event_list_is_paginated_by_cursor(self):
+        """
+        Test that the event list is served page by page in (-start_date, id) order
+        following the next/previous cursors
+        """
+        self.client.force_authenticate(user=self.user)
+        start_date = timezone.now() + timezone.timedelta(days=10)
+        events = baker.make(
+            'events.Event',
+            _quantity=5,
+            window_start_date=timezone.now() - timezone.timedelta(days=1),
+            window_end_date=timezone.now() + timezone.timedelta(days=5),
+            start_date=start_date,
+            end_date=start_date + timezone.timedelta(days=1),
+        )
+        later_event = baker.make(
+            'events.Event',
+            window_start_date=timezone.now() - timezone.timedelta(days=1),
+            window_end_date=timezone.now() + timezone.timedelta(days=5),
+            start_date=start_date + timezone.timedelta(days=1),
+            end_date=start_date + timezone.timedelta(days=2),
+        )
+        expected_ids = [later_event.id] + [event.id for event in events]
 
+        response = self.client.get(self.url, {'page_size': 4})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data['previous'])
+        first_page = [event['id'] for event in response.data['results']]
 
+        response = self.client.get(response.data['next'])
+        self.assertIsNone(response.data['next'])
+        second_page = [event['id'] for event in response.data['results']]
+        self.assertEqual(first_page + second_page, expected_ids)
 
+        response = self.client.get(response.data['previous'])
+        self.assertEqual([event['id'] for event in response.data['results']], first_page)
 
+    def test_event_list_invalid_cursor_fails(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
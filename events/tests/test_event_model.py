@@ -7,7 +7,7 @@ from faker import Faker
 
 from model_bakery import baker
 
-from events.models import Event, Booking
+from events.models import Event, Booking, local_day_range
 
 fake = Faker()
 
@@ -96,6 +96,29 @@ class EventModelTest(TestCase):
         event = baker.make('events.Event', **self.data_1)
         self.assertTrue(event.is_open_for_booking)
 
+    def test_open_for_booking_matches_is_open_for_booking(self):
+        """
+        Test that the queryset filter agrees with the is_open_for_booking property
+        """
+        now = timezone.now()
+        open_window = {
+            'window_start_date': now - timezone.timedelta(days=1),
+            'window_end_date': now + timezone.timedelta(days=1),
+        }
+        open_event = baker.make('events.Event', capacity=2, **open_window)
+        full_event = baker.make('events.Event', capacity=1, **open_window)
+        full_event.participants.add(self.user1)
+        inactive_event = baker.make('events.Event', capacity=2, is_active=False, **open_window)
+        future_event = baker.make('events.Event', **self.data_1)
+
+        events = Event.objects.open_for_booking(now)
+
+        self.assertEqual(list(events), [open_event])
+        self.assertEqual(events.get().available_seats, 2)
+        for event in (open_event, full_event, inactive_event, future_event):
+            event.refresh_from_db()
+            self.assertEqual(event.is_open_for_booking, event in events)
+
     def test_last_day_booked_seat_count(self):
         """
         Test the last day booked seat count property
@@ -123,6 +146,79 @@ class EventModelTest(TestCase):
         )
         self.assertEqual(event.last_day_booked_seat_count, 1)
 
+    def test_last_day_booked_seat_count_uses_day_boundaries(self):
+        """
+        Test that the last day is the whole calendar day of window_end_date, [00:00, next 00:00)
+        """
+        self.data_1['window_start_date'] = timezone.now() - timezone.timedelta(days=5)
+        self.data_1['window_end_date'] = timezone.now() + timezone.timedelta(days=5)
+        event = baker.make('events.Event', **self.data_1)
+        users = baker.make('accounts.CustomUser', _quantity=3)
+        bookings = [baker.make('events.Booking', event=event, participant=user) for user in users]
+
+        day_start, day_end = local_day_range(event.window_end_date)
+        created_at = [day_start - timezone.timedelta(microseconds=1), day_start, day_end]
+        for booking, value in zip(bookings, created_at):
+            Booking.objects.filter(pk=booking.pk).update(created_at=value)
+
+        # only the booking made exactly at midnight of the last day counts
+        self.assertEqual(event.last_day_booked_seat_count, 1)
+        self.assertEqual(Event.objects.with_summary().get(pk=event.pk).last_day_booking_count, 1)
+
+    def test_booked_count_follows_bookings(self):
+        """
+        Test that booked_count is kept in sync on booking create/delete
+        """
+        self.data_1['window_start_date'] = timezone.now() - timezone.timedelta(days=1)
+        self.data_1['window_end_date'] = timezone.now() + timezone.timedelta(days=1)
+        event = baker.make('events.Event', **self.data_1)
+
+        booking = baker.make('events.Booking', event=event, participant=self.user1)
+        event.participants.add(self.user2, self.user3)
+        event.refresh_from_db()
+        self.assertEqual(event.booked_count, 3)
+
+        booking.delete()
+        event.participants.remove(self.user2)
+        event.refresh_from_db()
+        self.assertEqual(event.booked_count, 1)
+        self.assertEqual(event.booked_count, Booking.objects.filter(event=event).count())
+
+        Booking.objects.filter(event=event).delete()
+        event.refresh_from_db()
+        self.assertEqual(event.booked_count, 0)
+
+    def test_no_of_participants_does_not_count_bookings(self):
+        """
+        Test that the seat properties read the counter instead of counting the join table
+        """
+        self.data_1['participants'] = [self.user2, self.user3]
+        self.data_1['window_start_date'] = timezone.now() - timezone.timedelta(days=5)
+        self.data_1['window_end_date'] = timezone.now() + timezone.timedelta(days=5)
+        event = Event.objects.get(pk=baker.make('events.Event', **self.data_1).pk)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(event.no_of_participants, 2)
+            self.assertEqual(event.remaining_seat_count, event.capacity - 2)
+            self.assertTrue(event.is_open_for_booking)
+
+    def test_event_save_does_not_overwrite_booked_count(self):
+        """
+        Test that saving a stale event instance keeps the counter maintained by bookings
+        """
+        self.data_1['window_start_date'] = timezone.now() - timezone.timedelta(days=1)
+        self.data_1['window_end_date'] = timezone.now() + timezone.timedelta(days=1)
+        event = baker.make('events.Event', **self.data_1)
+        stale_event = Event.objects.get(pk=event.pk)
+
+        baker.make('events.Booking', event=event, participant=self.user1)
+        stale_event.title = fake.text(20)
+        stale_event.save()
+
+        stale_event.refresh_from_db()
+        self.assertEqual(stale_event.booked_count, 1)
+
+
 
 
 
@@ -0,0 +1,94 @@
+import csv
+import io
+import json
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from model_bakery import baker
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from events.models import Booking, Event
+
+
+class EventParticipantAPITestCase(APITestCase):
+    def setUp(self):
+        self.user = baker.make(get_user_model(), is_staff=False, is_superuser=False)
+        self.admin_user = baker.make(get_user_model(), is_staff=True, is_superuser=True)
+        self.event = baker.make(
+            Event,
+            window_start_date=timezone.now() - timezone.timedelta(days=1),
+            window_end_date=timezone.now() + timezone.timedelta(days=1),
+            start_date=timezone.now() + timezone.timedelta(days=2),
+            end_date=timezone.now() + timezone.timedelta(days=3),
+        )
+        self.bookings = baker.make(Booking, event=self.event, _quantity=3)
+        # booking of another event
+        baker.make(Booking, event=baker.make(
+            Event,
+            window_start_date=timezone.now() - timezone.timedelta(days=1),
+            window_end_date=timezone.now() + timezone.timedelta(days=1),
+        ))
+
+        self.url = reverse('events:participants', args=[self.event.pk])
+        self.export_url = reverse('events:participants-export', args=[self.event.pk])
+
+    def test_participant_list_api_fails_for_user_role(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_participant_list_api_is_paginated_in_booking_order(self):
+        self.client.force_authenticate(user=self.admin_user)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        participants = response.data['results']
+
+        response = self.client.get(response.data['next'])
+        self.assertIsNone(response.data['next'])
+        participants += response.data['results']
+
+        self.assertEqual(
+            [participant['participant'] for participant in participants],
+            [booking.participant_id for booking in self.bookings]
+        )
+        self.assertEqual(participants[0]['email'], self.bookings[0].participant.email)
+        self.assertEqual(participants[0]['booking_code'], self.bookings[0].booking_code)
+
+    def test_participant_export_api_fails_for_user_role(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.export_url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_participant_export_api_streams_csv(self):
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get(self.export_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(
+            [(int(row['participant']), row['booking_code']) for row in rows],
+            [(booking.participant_id, booking.booking_code) for booking in self.bookings]
+        )
+
+    def test_participant_export_api_streams_ndjson(self):
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get(self.export_url, {'file_format': 'ndjson'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(
+            [row['username'] for row in rows],
+            [booking.participant.username for booking in self.bookings]
+        )
+
+    def test_participant_export_api_unknown_format_fails(self):
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get(self.export_url, {'file_format': 'xml'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
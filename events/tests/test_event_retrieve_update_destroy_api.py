@@ -64,6 +64,32 @@ class EventRetrieveUpdateDestroyAPITestCase(APITestCase):
         self.assertEqual(response.data['id'], self.event.id)
         self.assertEqual(response.data['title'], self.event.title)
 
+    def test_retrieve_event_api_user_role_does_not_fetch_participants(self):
+        """
+        Test that a regular user gets the event without participants in a single query
+        """
+        self.event.participants.add(*baker.make(get_user_model(), _quantity=3))
+        self.client.force_authenticate(user=self.user)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('participants', response.data)
+
+    def test_retrieve_event_api_superuser_gets_prefetched_participants(self):
+        """
+        Test that a superuser gets the participant ids with one prefetch query
+        """
+        participants = baker.make(get_user_model(), _quantity=3)
+        self.event.participants.add(*participants)
+        superuser = baker.make(get_user_model(), is_staff=True, is_superuser=True)
+        self.client.force_authenticate(user=superuser)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertCountEqual(response.data['participants'], [user.pk for user in participants])
+
     def test_update_event_api_unauthenticated_request_fails(self):
         """
         Test that an unauthenticated update request fails and returns a 401
@@ -0,0 +1,92 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+from model_bakery import baker
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from events.models import Event
+
+
+def make_event(**kwargs):
+    return baker.make(
+        Event,
+        window_start_date=timezone.now() - timezone.timedelta(days=1),
+        window_end_date=timezone.now() + timezone.timedelta(days=5),
+        start_date=timezone.now() + timezone.timedelta(days=10),
+        end_date=timezone.now() + timezone.timedelta(days=15),
+        **kwargs
+    )
+
+
+class EventSearchTestCase(TestCase):
+    """
+    Test EventQuerySet.search()
+    """
+
+    def setUp(self):
+        self.title_match = make_event(title='Python conference', short_description='talks', long_description='')
+        self.short_match = make_event(title='Meetup', short_description='python and coffee', long_description='')
+        self.long_match = make_event(title='Meetup', short_description='talks', long_description='all about python')
+        make_event(title='Cooking class', short_description='pasta', long_description='')
+
+    def test_search_ranks_title_over_descriptions(self):
+        events = list(Event.objects.search('python').order_by('-rank', 'id'))
+        self.assertEqual(events, [self.title_match, self.short_match, self.long_match])
+        self.assertGreater(events[0].rank, events[1].rank)
+        self.assertGreater(events[1].rank, events[2].rank)
+
+    def test_search_matches_all_the_words(self):
+        self.assertEqual(list(Event.objects.search('python coffee')), [self.short_match])
+
+    def test_saving_an_event_keeps_its_search_vector(self):
+        self.title_match.title = 'Django conference'
+        self.title_match.save()
+
+        self.assertFalse(Event.objects.search('python').filter(pk=self.title_match.pk).exists())
+        self.assertTrue(Event.objects.search('django').filter(pk=self.title_match.pk).exists())
+
+    @skipUnless(connection.vendor == 'postgresql', 'the vector is maintained by a postgres trigger')
+    def test_search_vector_is_maintained_by_the_database(self):
+        vector = Event.objects.values_list('search_vector', flat=True).get(pk=self.title_match.pk)
+        self.assertIn("'python':1A", vector)
+
+
+class EventSearchAPITestCase(APITestCase):
+    """
+    Test ?q= on the event list
+    """
+
+    def setUp(self):
+        self.url = reverse('events:events')
+        self.user = baker.make('accounts.CustomUser', is_staff=False, is_superuser=False)
+
+    def test_search_results_are_ranked_and_paginated(self):
+        description_matches = [
+            make_event(title='Meetup', short_description='python', long_description='') for _ in range(2)
+        ]
+        title_match = make_event(title='Python conference', short_description='talks', long_description='')
+        make_event(title='Cooking class', short_description='pasta', long_description='')
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.url, {'q': 'python', 'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first_page = [event['id'] for event in response.data['results']]
+        self.assertNotIn('rank', response.data['results'][0])
+
+        response = self.client.get(response.data['next'])
+        self.assertIsNone(response.data['next'])
+        second_page = [event['id'] for event in response.data['results']]
+
+        self.assertEqual(first_page + second_page, [title_match.id] + [event.id for event in description_matches])
+
+    def test_blank_search_lists_every_event(self):
+        make_event(title='Python conference')
+        make_event(title='Cooking class')
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.url, {'q': ' '})
+        self.assertEqual(len(response.data['results']), 2)
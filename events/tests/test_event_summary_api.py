@@ -5,6 +5,8 @@ from rest_framework.test import APITestCase
 from rest_framework import status
 from django.urls import reverse
 
+from events.models import Booking
+
 
 class EventSummaryAPITestCase(APITestCase):
     def setUp(self):
@@ -60,5 +62,72 @@ class EventSummaryAPITestCase(APITestCase):
         self.assertEqual(response.data['window_end_date'], self.event.window_end_date.isoformat())
         self.assertEqual(response.data['is_active'], self.event.is_active)
         self.assertEqual(response.data['organizer'], self.event.organizer.pk)
-        self.assertEqual(response.data['participants'], [user.pk for user in self.event.participants.all()])
+        # participants are served by their own paginated endpoint
+        self.assertNotIn('participants', response.data)
         self.assertEqual(response.data['no_of_participants'], self.event.no_of_participants)
+        self.assertEqual(response.data['remaining_seat_count'], self.event.capacity - 10)
+        self.assertEqual(response.data['last_day_booked_seat_count'], 0)
+
+    def test_event_summary_api_counts_last_day_bookings(self):
+        """
+        Test that bookings made on the last day of the booking window are counted
+        """
+        self.event.window_end_date = timezone.now() + timezone.timedelta(minutes=1)
+        self.event.save()
+        baker.make('events.Booking', event=self.event, _quantity=2)
+
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get(self.event_summary_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['last_day_booked_seat_count'], 2)
+        self.assertEqual(response.data['no_of_participants'], 2)
+
+    def test_event_summary_api_query_count_is_fixed(self):
+        """
+        Test that the summary figures don't cost a query each,
+        only the event with the annotated figures is fetched whatever the number of participants
+        """
+        self.client.force_authenticate(user=self.admin_user)
+        baker.make('events.Booking', event=self.event, _quantity=5)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.event_summary_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['no_of_participants'], 5)
+
+    def test_event_booking_histogram_api_groups_bookings_per_day(self):
+        """
+        Test that the histogram returns the number of bookings per day
+        """
+        today = timezone.now()
+        yesterday = today - timezone.timedelta(days=1)
+        for created_at, quantity in ((yesterday, 2), (today, 3)):
+            bookings = baker.make('events.Booking', event=self.event, _quantity=quantity)
+            Booking.objects.filter(pk__in=[booking.pk for booking in bookings]).update(created_at=created_at)
+        # bookings of other events are not counted
+        baker.make('events.Booking', event=baker.make(
+            'events.Event',
+            window_start_date=timezone.now() - timezone.timedelta(days=1),
+            window_end_date=timezone.now() + timezone.timedelta(days=1),
+        ))
+
+        self.client.force_authenticate(user=self.admin_user)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('events:summary-histogram', args=[self.event.pk]))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [
+            {'day': yesterday.date().isoformat(), 'count': 2},
+            {'day': today.date().isoformat(), 'count': 3},
+        ])
+
+    def test_event_booking_histogram_api_fails_for_user_role(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse('events:summary-histogram', args=[self.event.pk]))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_event_booking_histogram_api_unknown_event_fails(self):
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get(reverse('events:summary-histogram', args=[self.event.pk + 100]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
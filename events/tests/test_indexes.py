@@ -0,0 +1,109 @@
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection
+from django.test import TestCase
+from django.utils import timezone
+from model_bakery import baker
+
+from events.models import Booking, Event
+
+
+@skipUnless(connection.vendor == 'sqlite', 'plans of the sqlite test database')
+class QueryPlanTestCase(TestCase):
+    """
+    Test that the hot queries are served by the composite/partial indexes
+    """
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn('USING INDEX {}'.format(index_name), plan)
+
+    def test_active_events_in_booking_window(self):
+        now = timezone.now()
+        queryset = Event.objects.filter(
+            is_active=True, window_start_date__lte=now, window_end_date__gte=now
+        ).order_by()
+        self.assertUsesIndex(queryset, 'event_active_window')
+
+    def test_registered_events_are_a_semi_join(self):
+        user = baker.make(get_user_model())
+        plan = Event.objects.registered_by(user).order_by('-start_date', 'id').explain()
+        # one index probe per event, no join fanning out the bookings
+        self.assertIn('(event_id=? AND participant_id=?)', plan)
+        self.assertNotIn('SCAN events_booking', plan)
+
+    def test_event_list_page(self):
+        self.assertUsesIndex(Event.objects.order_by('-start_date', 'id')[:21], 'event_start_date_id')
+
+    def test_bookings_of_participant_page(self):
+        queryset = Booking.objects.filter(participant_id=1).order_by('-created_at', 'id')[:21]
+        self.assertUsesIndex(queryset, 'booking_participant_created')
+
+    def test_bookings_of_event_page(self):
+        queryset = Booking.objects.filter(event_id=1).order_by('created_at', 'id')[:21]
+        self.assertUsesIndex(queryset, 'booking_event_created')
+
+    def test_bookings_of_event_in_time_range(self):
+        queryset = Booking.objects.filter(event_id=1, created_at__gte=timezone.now()).order_by()
+        self.assertUsesIndex(queryset, 'booking_event_created')
+
+
+@skipUnless(connection.vendor == 'postgresql', 'plans of the postgres test database, TEST_DATABASE=postgresql')
+class PostgresQueryPlanTestCase(TestCase):
+    """
+    Test that postgres can serve the hot queries with the composite/partial indexes.
+    The test tables are nearly empty, sequential scans are turned off so the planner
+    shows the index it would use on a real table
+    """
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            # for the transaction of the test only
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertUsesIndex(self, queryset, index_name):
+        # "Index Scan using <index> on <table>" or "Bitmap Index Scan on <index>"
+        self.assertIn(index_name, queryset.explain())
+
+    def test_active_events_in_booking_window(self):
+        now = timezone.now()
+        queryset = Event.objects.filter(
+            is_active=True, window_start_date__lte=now, window_end_date__gte=now
+        ).order_by()
+        self.assertUsesIndex(queryset, 'event_active_window')
+
+    def test_registered_events_are_a_semi_join(self):
+        user = baker.make(get_user_model())
+        plan = Event.objects.registered_by(user).order_by('-start_date', 'id').explain()
+        # one index probe per event, no scan of the bookings
+        self.assertIn('booking_unique_event_participant', plan)
+        self.assertNotIn('Seq Scan on events_booking', plan)
+
+    def test_event_list_page(self):
+        self.assertUsesIndex(Event.objects.order_by('-start_date', 'id')[:21], 'event_start_date_id')
+
+    def test_bookings_of_participant_page(self):
+        queryset = Booking.objects.filter(participant_id=1).order_by('-created_at', 'id')[:21]
+        self.assertUsesIndex(queryset, 'booking_participant_created')
+
+    def test_bookings_of_event_page(self):
+        queryset = Booking.objects.filter(event_id=1).order_by('created_at', 'id')[:21]
+        self.assertUsesIndex(queryset, 'booking_event_created')
+
+    def test_event_search(self):
+        self.assertUsesIndex(Event.objects.search('music').order_by(), 'events_event_search_vector_gin')
+
+
+class BookingUniqueConstraintTestCase(TestCase):
+    def test_participant_books_an_event_once(self):
+        user = baker.make(get_user_model())
+        event = baker.make(
+            Event,
+            window_start_date=timezone.now() - timezone.timedelta(days=1),
+            window_end_date=timezone.now() + timezone.timedelta(days=1),
+        )
+        baker.make(Booking, event=event, participant=user)
+
+        with self.assertRaises(IntegrityError):
+            baker.make(Booking, event=event, participant=user)
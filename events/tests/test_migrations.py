@@ -0,0 +1,47 @@
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+
+class DuplicateBookingsMigrationTest(TransactionTestCase):
+    """
+    0009_composite_indexes must stop on duplicate bookings instead of dropping them
+    """
+    migrate_from = [('events', '0008_booking_event_created_index')]
+    migrate_to = [('events', '0009_composite_indexes')]
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_duplicate_bookings_are_listed(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_from)
+        apps = executor.loader.project_state(self.migrate_from).apps
+        User = apps.get_model('accounts', 'CustomUser')
+        Event = apps.get_model('events', 'Event')
+        Booking = apps.get_model('events', 'Booking')
+
+        user = User.objects.create(username='user', email='user@example.com')
+        now = timezone.now()
+        event = Event.objects.create(
+            title='Event', short_description='Short', capacity=5, organizer=user, booked_count=2,
+            start_date=now, end_date=now, window_start_date=now, window_end_date=now,
+        )
+        bookings = [Booking.objects.create(event=event, participant=user, booking_code=code) for code in 'AB']
+
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        with self.assertRaisesMessage(RuntimeError, 'event {}, participant {}: bookings {}, {}'.format(
+            event.pk, user.pk, bookings[0].pk, bookings[1].pk
+        )):
+            executor.migrate(self.migrate_to)
+        self.assertEqual(Booking.objects.count(), 2)
+
+        # resolved by the operator
+        bookings[1].delete()
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(self.migrate_to)
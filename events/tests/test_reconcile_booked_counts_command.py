@@ -0,0 +1,42 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from model_bakery import baker
+
+from events.models import Event
+
+
+class ReconcileBookedCountsCommandTest(TestCase):
+    """
+    Test the reconcile_booked_counts management command
+    """
+    def setUp(self) -> None:
+        self.event = baker.make(
+            'events.Event',
+            window_start_date=timezone.now() - timezone.timedelta(days=1),
+            window_end_date=timezone.now() + timezone.timedelta(days=1),
+        )
+        baker.make('events.Booking', event=self.event, _quantity=3)
+        # simulate drift, e.g. a booking removed with raw sql
+        Event.objects.filter(pk=self.event.pk).update(booked_count=7)
+
+    def test_drifted_counter_is_fixed(self):
+        updated_at = Event.objects.get(pk=self.event.pk).updated_at
+        out = StringIO()
+        call_command('reconcile_booked_counts', stdout=out)
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.booked_count, 3)
+        # the conditional GETs see the fixed count
+        self.assertGreater(self.event.updated_at, updated_at)
+        self.assertIn('Reconciled 1 event(s)', out.getvalue())
+
+    def test_dry_run_only_reports(self):
+        out = StringIO()
+        call_command('reconcile_booked_counts', '--dry-run', stdout=out)
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.booked_count, 7)
+        self.assertIn('Event {}: booked_count 7 != 3 bookings'.format(self.event.pk), out.getvalue())
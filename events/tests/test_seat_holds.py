@@ -0,0 +1,177 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from model_bakery import baker
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from events.models import Booking, Event, SeatHold, WaitlistEntry
+from events.services.booking import NO_SEAT_LEFT, book_seat, book_seats
+from events.services.holds import expire_seat_holds, hold_seat
+from events.services.waitlist import join_waitlist
+
+
+def make_event(capacity=1):
+    return baker.make(
+        Event,
+        capacity=capacity,
+        window_start_date=timezone.now() - timezone.timedelta(days=1),
+        window_end_date=timezone.now() + timezone.timedelta(days=1),
+    )
+
+
+class SeatHoldServiceTest(TestCase):
+    """
+    Test the seat hold service
+    """
+    def setUp(self) -> None:
+        self.event = make_event()
+        self.user, self.other_user = baker.make(get_user_model(), _quantity=2)
+
+    @override_settings(SEAT_HOLD_TIMEOUT=60)
+    def test_held_seat_counts_against_capacity(self):
+        now = timezone.now()
+        hold = hold_seat(self.event, self.user, now=now)
+
+        self.event.refresh_from_db()
+        self.assertEqual(hold.expires_at, now + timezone.timedelta(seconds=60))
+        self.assertEqual(self.event.held_count, 1)
+        self.assertEqual(self.event.remaining_seat_count, 0)
+        self.assertFalse(Event.objects.open_for_booking().filter(pk=self.event.pk).exists())
+
+        with self.assertRaises(ValidationError):
+            book_seat(self.event, self.other_user)
+        with self.assertRaises(ValidationError):
+            hold_seat(self.event, self.other_user)
+
+    def test_booking_takes_the_held_seat(self):
+        hold_seat(self.event, self.user)
+        book_seat(self.event, self.user)
+
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.booked_count, self.event.held_count), (1, 0))
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_group_booking_takes_the_held_seats(self):
+        self.event = make_event(capacity=2)
+        third_user = baker.make(get_user_model())
+        hold_seat(self.event, self.user)
+        hold_seat(self.event, self.other_user)
+
+        # sold out by the holds, the holders still book their seats
+        results = book_seats(self.event.pk, [third_user.pk, self.user.pk, self.other_user.pk], atomic=False)
+
+        self.assertEqual(
+            [result.get('error') for result in results], [NO_SEAT_LEFT, None, None]
+        )
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.booked_count, self.event.held_count), (2, 0))
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_hold_fails_when_holding_or_booked(self):
+        hold_seat(self.event, self.user)
+        with self.assertRaises(ValidationError):
+            hold_seat(self.event, self.user)
+
+        book_seat(self.event, self.user)
+        with self.assertRaises(ValidationError):
+            hold_seat(self.event, self.user)
+
+    def test_expired_hold_is_replaced(self):
+        hold_seat(self.event, self.user, now=timezone.now() - timezone.timedelta(days=1, seconds=-60))
+        hold = hold_seat(self.event, self.user)
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.held_count, 1)
+        self.assertEqual(list(SeatHold.objects.all()), [hold])
+
+    def test_expire_seat_holds_in_batches(self):
+        self.event = make_event(capacity=5)
+        users = baker.make(get_user_model(), _quantity=4)
+        past = timezone.now() - timezone.timedelta(hours=1)
+        for user in users[:3]:
+            hold_seat(self.event, user)
+        SeatHold.objects.update(expires_at=past)
+        live_hold = hold_seat(self.event, users[3])
+
+        self.assertEqual(expire_seat_holds(batch_size=2), 2)
+        self.assertEqual(expire_seat_holds(batch_size=2), 1)
+        self.assertEqual(expire_seat_holds(batch_size=2), 0)
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.held_count, 1)
+        self.assertEqual(list(SeatHold.objects.all()), [live_hold])
+
+
+class ExpireSeatHoldsCommandTest(TransactionTestCase):
+    """
+    Test the expire_seat_holds management command
+    """
+    def test_expired_holds_are_released_to_the_waitlist(self):
+        event = make_event(capacity=2)
+        holders = baker.make(get_user_model(), _quantity=2)
+        waiting = baker.make(get_user_model())
+        for user in holders:
+            hold_seat(event, user)
+        event.refresh_from_db()
+        join_waitlist(event, waiting)
+        SeatHold.objects.filter(user=holders[0]).update(expires_at=timezone.now() - timezone.timedelta(minutes=1))
+
+        out = StringIO()
+        call_command('expire_seat_holds', batch_size=1, stdout=out)
+
+        event.refresh_from_db()
+        self.assertIn('Released 1 expired hold(s)', out.getvalue())
+        self.assertEqual((event.booked_count, event.held_count), (1, 1))
+        self.assertEqual(list(Booking.objects.values_list('participant_id', flat=True)), [waiting.pk])
+        self.assertFalse(WaitlistEntry.objects.exists())
+
+
+class SeatHoldAPITestCase(APITestCase):
+    def setUp(self):
+        self.user = baker.make(get_user_model(), is_staff=False, is_superuser=False)
+        self.event = make_event()
+        self.url = reverse('events:hold', args=[self.event.pk])
+
+    def test_hold_api_requires_authentication(self):
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_hold_check_and_release(self):
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIn('expires_at', response.data)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['user'], self.user.pk)
+
+        response = self.client.delete(self.url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.held_count, 0)
+
+        response = self.client.delete(self.url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_booking_with_a_hold(self):
+        self.client.force_authenticate(user=self.user)
+        self.client.post(self.url)
+
+        response = self.client.post(reverse('events:bookings'), {'event': self.event.pk})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.booked_count, self.event.held_count), (1, 0))
+
+    def test_hold_fails_for_sold_out_event(self):
+        baker.make(Booking, event=self.event)
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
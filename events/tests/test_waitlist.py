@@ -0,0 +1,161 @@
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from model_bakery import baker
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from events.models import Booking, Event, WaitlistEntry
+from events.services.booking import book_seat
+from events.services.waitlist import join_waitlist, promote_next
+
+
+def make_sold_out_event(capacity=1):
+    event = baker.make(
+        Event,
+        capacity=capacity,
+        window_start_date=timezone.now() - timezone.timedelta(days=1),
+        window_end_date=timezone.now() + timezone.timedelta(days=1),
+    )
+    for _ in range(capacity):
+        book_seat(event, baker.make(get_user_model()))
+    event.refresh_from_db()
+    return event
+
+
+class WaitlistServiceTest(TestCase):
+    """
+    Test the waitlist service
+    """
+    def setUp(self) -> None:
+        self.event = make_sold_out_event()
+        self.users = baker.make(get_user_model(), _quantity=3)
+
+    def test_join_keeps_the_order(self):
+        entries = [join_waitlist(self.event, user) for user in self.users]
+        self.assertEqual([entry.position for entry in entries], [1, 2, 3])
+
+        entries[0].delete()
+        self.assertEqual(entries[2].position, 2)
+
+    def test_join_fails_when_seats_are_left_or_already_waiting(self):
+        with self.assertRaises(ValidationError):
+            join_waitlist(self.event, Booking.objects.get(event=self.event).participant)
+
+        join_waitlist(self.event, self.users[0])
+        with self.assertRaises(ValidationError):
+            join_waitlist(self.event, self.users[0])
+
+        open_event = baker.make(
+            Event,
+            capacity=1,
+            window_start_date=timezone.now() - timezone.timedelta(days=1),
+            window_end_date=timezone.now() + timezone.timedelta(days=1),
+        )
+        with self.assertRaises(ValidationError):
+            join_waitlist(open_event, self.users[0])
+
+    def test_promote_next_books_the_head_of_the_queue(self):
+        for user in self.users:
+            join_waitlist(self.event, user)
+        # no seat released yet
+        self.assertIsNone(promote_next(self.event.pk))
+
+        Event.objects.filter(pk=self.event.pk).update(capacity=2)
+        booking = promote_next(self.event.pk)
+
+        self.event.refresh_from_db()
+        self.assertEqual(booking.participant_id, self.users[0].pk)
+        self.assertEqual(self.event.booked_count, 2)
+        self.assertEqual(
+            list(WaitlistEntry.objects.values_list('user_id', flat=True)), [self.users[1].pk, self.users[2].pk]
+        )
+
+    def test_promote_next_skips_users_who_booked_meanwhile(self):
+        for user in self.users[:2]:
+            join_waitlist(self.event, user)
+        Event.objects.filter(pk=self.event.pk).update(capacity=3)
+        book_seat(self.event, self.users[0])
+
+        booking = promote_next(self.event.pk)
+        self.assertEqual(booking.participant_id, self.users[1].pk)
+        self.assertFalse(WaitlistEntry.objects.exists())
+        self.assertIsNone(promote_next(self.event.pk))
+
+
+class WaitlistPromotionOnDeleteTest(TransactionTestCase):
+    """
+    The seat of a deleted booking goes to the waitlist once the delete is committed
+    """
+    def test_deleted_booking_promotes_the_next_user(self):
+        event = make_sold_out_event()
+        user = baker.make(get_user_model())
+        join_waitlist(event, user)
+
+        Booking.objects.get(event=event).delete()
+
+        event.refresh_from_db()
+        self.assertEqual(list(Booking.objects.values_list('participant_id', flat=True)), [user.pk])
+        self.assertEqual(event.booked_count, 1)
+        self.assertFalse(WaitlistEntry.objects.exists())
+
+    def test_deleted_user_releases_the_seat(self):
+        event = make_sold_out_event()
+        user = baker.make(get_user_model())
+        join_waitlist(event, user)
+
+        Booking.objects.get(event=event).participant.delete()
+
+        event.refresh_from_db()
+        self.assertEqual(list(Booking.objects.values_list('participant_id', flat=True)), [user.pk])
+        self.assertEqual(event.booked_count, 1)
+
+    def test_deleted_event_cascades_without_promoting(self):
+        event = make_sold_out_event(capacity=3)
+        join_waitlist(event, baker.make(get_user_model()))
+
+        # one DELETE per table, however many bookings
+        with self.assertNumQueries(5):
+            event.delete()
+
+        self.assertFalse(Booking.objects.exists())
+        self.assertFalse(WaitlistEntry.objects.exists())
+
+
+class WaitlistAPITestCase(APITestCase):
+    def setUp(self):
+        self.user = baker.make(get_user_model(), is_staff=False, is_superuser=False)
+        self.event = make_sold_out_event()
+        self.url = reverse('events:waitlist', args=[self.event.pk])
+
+    def test_waitlist_api_requires_authentication(self):
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_join_check_and_leave(self):
+        join_waitlist(self.event, baker.make(get_user_model()))
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['position'], 2)
+
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['position'], 2)
+        self.assertEqual(response.data['user'], self.user.pk)
+
+        response = self.client.delete(self.url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_join_unknown_event(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(reverse('events:waitlist', args=[self.event.pk + 1]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
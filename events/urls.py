@@ -1,11 +1,21 @@
 from django.urls import path
 
 from .views import (
+    BookingBulkCreateAPIView,
     BookingListCreateAPIView,
-    BookingRetrieveAPIView,
+    BookingRetrieveDestroyAPIView,
+    EventBookingHistogramAPIView,
+    EventCacheStatsAPIView,
+    EventCancelAPIView,
+    EventExportAPIView,
+    EventImportAPIView,
     EventListCreateAPIView,
+    EventParticipantExportAPIView,
+    EventParticipantListAPIView,
     EventRetrieveUpdateDestroyAPIView,
+    EventSeatHoldAPIView,
     EventSummaryAPIView,
+    EventWaitlistAPIView,
 )
 
 
@@ -14,8 +24,18 @@ app_name = 'events'
 urlpatterns = [
     path('', EventListCreateAPIView.as_view(), name='events'),
     path('/<int:pk>', EventRetrieveUpdateDestroyAPIView.as_view(), name='event'),
+    path('/import', EventImportAPIView.as_view(), name='events-import'),
+    path('/export', EventExportAPIView.as_view(), name='events-export'),
+    path('/cache/stats', EventCacheStatsAPIView.as_view(), name='cache-stats'),
     path('/tickets', BookingListCreateAPIView.as_view(), name='bookings'),
-    path('/tickets/<int:pk>', BookingRetrieveAPIView.as_view(), name='booking'),
+    path('/tickets/bulk', BookingBulkCreateAPIView.as_view(), name='bookings-bulk'),
+    path('/tickets/<int:pk>', BookingRetrieveDestroyAPIView.as_view(), name='booking'),
+    path('/<int:pk>/cancel', EventCancelAPIView.as_view(), name='event-cancel'),
     path('/<int:pk>/summary', EventSummaryAPIView.as_view(), name='summary'),
+    path('/<int:pk>/summary/histogram', EventBookingHistogramAPIView.as_view(), name='summary-histogram'),
+    path('/<int:pk>/participants', EventParticipantListAPIView.as_view(), name='participants'),
+    path('/<int:pk>/participants/export', EventParticipantExportAPIView.as_view(), name='participants-export'),
+    path('/<int:pk>/waitlist', EventWaitlistAPIView.as_view(), name='waitlist'),
+    path('/<int:pk>/hold', EventSeatHoldAPIView.as_view(), name='hold'),
 
 ]
@@ -1,33 +1,95 @@
-from rest_framework.exceptions import NotFound
-from rest_framework.generics import ListCreateAPIView, RetrieveAPIView, RetrieveUpdateDestroyAPIView, GenericAPIView
+import codecs
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import Count, Max, Prefetch
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.generics import (
+    ListAPIView, ListCreateAPIView, RetrieveAPIView, RetrieveUpdateDestroyAPIView, GenericAPIView
+)
+from rest_framework.mixins import DestroyModelMixin
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly, IsAdminUser
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 
 from core.permissions import IsAdminOrOwnerOnly
-from .models import Event, Booking
+from core.streaming import READERS, STREAMERS
+from core.views import ConditionalGetMixin
+from . import cache
+from .models import Event, Booking, SeatHold, WaitlistEntry
+from .pagination import (
+    BookingCursorPagination, EventCursorPagination, EventSearchCursorPagination, ParticipantCursorPagination
+)
+from .services.booking import book_seats, cancel_booking, cancel_event
+from .services.catalog import EXPORT_FIELDS, export_rows, import_events
+from .services.holds import hold_seat, release_holds
+from .services.waitlist import join_waitlist
 from events.serializers import (
+    BookingBulkCreateSerializer,
+    BookingBulkResultSerializer,
+    BookingExpandedListSerializer,
     BookingListSerializer,
     BookingCreateSerializer,
     EventListSerializer,
     EventCreateSerializer,
+    EventImportErrorSerializer,
+    EventImportSerializer,
     EventRetrieveSerializer,
-    EventUpdateSerializer, BookingRetrieveSerializer, EventSummarySerializer
+    EventUpdateSerializer, BookingRetrieveSerializer, EventSummarySerializer,
+    BookingHistogramSerializer, EventParticipantSerializer, SeatHoldSerializer, WaitlistEntrySerializer,
 )
 
 
-class EventListCreateAPIView(ListCreateAPIView):
+class EventListCreateAPIView(ConditionalGetMixin, ListCreateAPIView):
     """
     List all events, or create a new event.
     """
     serializer_class = EventListSerializer
     permission_classes = (IsAuthenticatedOrReadOnly,)
+    pagination_class = EventCursorPagination
 
     def get_queryset(self):
         qs = Event.objects.all()
         is_registered = self.request.query_params.get('registered', '').lower()
         if is_registered == 'true':
-            qs = qs.filter(participants__in=[self.request.user])
-        return qs.order_by('-start_date')
+            qs = qs.registered_by(self.request.user)
+        if self.request.query_params.get('open', '').lower() == 'true':
+            qs = qs.open_for_booking()
+        if self.search_query:
+            return qs.search(self.search_query).order_by('-rank', 'id')
+        return qs.order_by('-start_date', 'id')
+
+    @property
+    def search_query(self):
+        """
+        The words to search the events for with ?q=
+        """
+        return self.request.query_params.get('q', '').strip()
+
+    @property
+    def paginator(self):
+        """
+        Search results are paged by rank
+        """
+        if not hasattr(self, '_paginator'):
+            self._paginator = EventSearchCursorPagination() if self.search_query else self.pagination_class()
+        return self._paginator
+
+    def get_validators(self):
+        """
+        Fingerprint the listed events with their count and latest change
+        """
+        aggregates = self.filter_queryset(self.get_queryset()).order_by().aggregate(
+            count=Count('pk'),
+            last_modified=Max('updated_at'),
+        )
+        fingerprint = '{}:{}'.format(aggregates['count'], aggregates['last_modified'])
+        return fingerprint, aggregates['last_modified']
 
     def get_serializer_class(self):
         """
@@ -55,12 +117,48 @@ class EventListCreateAPIView(ListCreateAPIView):
         serializer.save(organizer=self.request.user)
 
 
-class EventRetrieveUpdateDestroyAPIView(RetrieveUpdateDestroyAPIView):
+class EventRetrieveUpdateDestroyAPIView(ConditionalGetMixin, RetrieveUpdateDestroyAPIView):
     """
     Retrieve, update or delete a event instance.
     """
     queryset = Event.objects.all()
 
+    def get_queryset(self):
+        """
+        Override the default queryset method
+        to prefetch only the participant ids admins get to see.
+        """
+        qs = super(EventRetrieveUpdateDestroyAPIView, self).get_queryset()
+        if self.request.method == 'GET' and self.request.user.is_superuser:
+            qs = qs.prefetch_related(
+                Prefetch('participants', queryset=get_user_model().objects.only('pk'))
+            )
+        return qs
+
+    def get_validators(self):
+        """
+        Validate against the cached representation, without touching the db
+        (only authentication is required to read an event), or else against the
+        event fetched for the response anyway. Seat changes bump updated_at too.
+        The cache version is read before the event, see events.cache
+        """
+        pk = self.kwargs['pk']
+        self.cache_version = cache.get_versions([pk])[pk]
+        self.cached_data = self.get_serializer().get_cached_representation(pk, self.cache_version)
+        if self.cached_data is not None:
+            updated_at = parse_datetime(self.cached_data['updated_at'])
+        else:
+            self.object = self.get_object()
+            updated_at = self.object.updated_at
+        return updated_at.isoformat(), updated_at
+
+    def retrieve(self, request, *args, **kwargs):
+        if self.cached_data is not None:
+            return Response(self.cached_data)
+        serializer = self.get_serializer(self.object)
+        serializer.cache_representation(self.object.pk, serializer.data, self.cache_version)
+        return Response(serializer.data)
+
     def get_serializer_class(self):
         """
         Override the default serializer class
@@ -80,18 +178,79 @@ class EventRetrieveUpdateDestroyAPIView(RetrieveUpdateDestroyAPIView):
         return [IsAdminUser()]
 
 
+class EventImportAPIView(GenericAPIView):
+    """
+    Bulk import events from a csv or ndjson upload, organized by the requester.
+    """
+    serializer_class = EventImportSerializer
+    permission_classes = (IsAdminUser, )
+    parser_classes = (MultiPartParser, )
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        # parsed line by line straight from the upload
+        lines = codecs.iterdecode(data['file'], 'utf-8-sig')
+        result = import_events(
+            READERS[data['file_format']](lines),
+            request.user,
+            batch_size=data['batch_size'],
+            dry_run=data['dry_run'],
+        )
+
+        if not result.errors:
+            response_status = status.HTTP_200_OK if data['dry_run'] else status.HTTP_201_CREATED
+        elif not result.created:
+            response_status = status.HTTP_400_BAD_REQUEST
+        else:
+            response_status = status.HTTP_207_MULTI_STATUS
+        errors = [{'row': number, 'error': message} for number, message in result.errors]
+        return Response(
+            {'created': result.created, 'errors': EventImportErrorSerializer(errors, many=True).data},
+            status=response_status,
+        )
+
+
+class EventExportAPIView(GenericAPIView):
+    """
+    Export every event as csv (default) or ndjson with ?file_format=, in the import format
+    streamed from a server side cursor.
+    """
+    permission_classes = (IsAdminUser, )
+    chunk_size = 2000
+
+    def get(self, request, *args, **kwargs):
+        file_format = request.query_params.get('file_format', 'csv').lower()
+        if file_format not in STREAMERS:
+            raise ValidationError({'file_format': 'Should be one of: {}'.format(', '.join(STREAMERS))})
+        return STREAMERS[file_format]('events', EXPORT_FIELDS, export_rows(chunk_size=self.chunk_size))
+
+
 class BookingListCreateAPIView(ListCreateAPIView):
     """
     List all bookings, or create a new booking.
     """
     permission_classes = (IsAuthenticatedOrReadOnly, )
+    pagination_class = BookingCursorPagination
 
     def get_queryset(self):
         """
         Override the default queryset method
         to return the bookings for the current user.
         """
-        return Booking.objects.filter(participant=self.request.user)
+        qs = Booking.objects.filter(participant=self.request.user)
+        if self.expand_event:
+            # inline the events with a join rather than a query per booking
+            qs = qs.select_related('event')
+        return qs.order_by('-created_at', 'id')
+
+    @property
+    def expand_event(self):
+        """
+        True if the client asked for the events inlined with ?expand=event
+        """
+        return 'event' in self.request.query_params.get('expand', '').lower().split(',')
 
     def get_serializer_class(self):
         """
@@ -99,10 +258,39 @@ class BookingListCreateAPIView(ListCreateAPIView):
         to return the appropriate serializer class for request method.
         """
         if self.request.method == 'GET':
+            if self.expand_event:
+                return BookingExpandedListSerializer
             return BookingListSerializer
         return BookingCreateSerializer
 
 
+class BookingBulkCreateAPIView(GenericAPIView):
+    """
+    Book a group of participants into an event at once.
+    """
+    serializer_class = BookingBulkCreateSerializer
+    permission_classes = (IsAdminUser, )
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        atomic = serializer.validated_data['atomic']
+        results = book_seats(
+            serializer.validated_data['event'].pk,
+            serializer.validated_data['participants'],
+            atomic=atomic,
+        )
+
+        failed = sum('error' in result for result in results)
+        if not failed:
+            response_status = status.HTTP_201_CREATED
+        elif atomic or failed == len(results):
+            response_status = status.HTTP_400_BAD_REQUEST
+        else:
+            response_status = status.HTTP_207_MULTI_STATUS
+        return Response({'results': BookingBulkResultSerializer(results, many=True).data}, status=response_status)
+
+
 class BookingRetrieveAPIView(RetrieveAPIView):
     """
     Retrieve a booking instance.
@@ -112,7 +300,39 @@ class BookingRetrieveAPIView(RetrieveAPIView):
     permission_classes = (IsAdminOrOwnerOnly,)
 
 
-class EventSummaryAPIView(GenericAPIView):
+class BookingRetrieveDestroyAPIView(DestroyModelMixin, BookingRetrieveAPIView):
+    """
+    Retrieve or cancel a booking instance.
+    """
+
+    def delete(self, request, *args, **kwargs):
+        return self.destroy(request, *args, **kwargs)
+
+    def perform_destroy(self, instance):
+        """
+        Cancel through the booking service so the seat is released exactly once,
+        a concurrent cancellation of the same booking ends up as not found
+        """
+        if not cancel_booking(instance.pk):
+            raise NotFound('Booking not found')
+
+
+class EventCancelAPIView(GenericAPIView):
+    """
+    Cancel an event: deactivate it and cancel all its bookings, holds and waitlist at once.
+    """
+    queryset = Event.objects.all()
+    permission_classes = (IsAdminUser, )
+
+    def post(self, request, *args, **kwargs):
+        event_id = self.kwargs.get('pk')
+        cancelled = cancel_event(event_id)
+        if cancelled is None:
+            raise NotFound('Event not found')
+        return Response({'event': event_id, 'cancelled_bookings': cancelled})
+
+
+class EventSummaryAPIView(ConditionalGetMixin, RetrieveAPIView):
     """
     Retrieve a summary of events.
     """
@@ -120,14 +340,29 @@ class EventSummaryAPIView(GenericAPIView):
     serializer_class = EventSummarySerializer
     permission_classes = (IsAdminUser, )
 
-    def get(self, request, *args, **kwargs):
+    def get_validators(self):
+        """
+        Validate against the event fetched for the response anyway,
+        bookings bump its updated_at too. is_open_for_booking also turns
+        with the clock, at the window boundaries: it's part of the fingerprint
+        and a boundary that has passed counts as the last modification
+        """
+        self.object = self.get_object()
+        now = timezone.now()
+        boundaries = (self.object.window_start_date, self.object.window_end_date)
+        last_modified = max([self.object.updated_at] + [boundary for boundary in boundaries if boundary <= now])
+        fingerprint = '{}|{}'.format(self.object.updated_at.isoformat(), self.object.is_open_for_booking)
+        return fingerprint, last_modified
 
-        obj = self.get_object()
-        serializer = self.get_serializer(obj)
+    def retrieve(self, request, *args, **kwargs):
+        serializer = self.get_serializer(self.object)
         return Response(serializer.data)
 
     def get_object(self):
-        qs = self.filter_queryset(self.queryset)
+        """
+        Fetch the event with all the summary figures in one query
+        """
+        qs = self.filter_queryset(self.get_queryset().with_summary())
         try:
             obj = qs.get(pk=self.kwargs.get('pk'))
         except Event.DoesNotExist:
@@ -135,5 +370,139 @@ class EventSummaryAPIView(GenericAPIView):
         return obj
 
 
+class EventBookingHistogramAPIView(GenericAPIView):
+    """
+    Retrieve the number of bookings of an event per day.
+    """
+    queryset = Event.objects.all()
+    serializer_class = BookingHistogramSerializer
+    permission_classes = (IsAdminUser, )
+
+    def get(self, request, *args, **kwargs):
+        event_id = self.kwargs.get('pk')
+        if not self.get_queryset().filter(pk=event_id).exists():
+            raise NotFound('Event not found')
+
+        histogram = Booking.objects.filter(event_id=event_id).per_day()
+        serializer = self.get_serializer(histogram, many=True)
+        return Response(serializer.data)
+
+
+class EventParticipantListAPIView(ListAPIView):
+    """
+    List the participants of an event, page by page.
+    """
+    serializer_class = EventParticipantSerializer
+    permission_classes = (IsAdminUser, )
+    pagination_class = ParticipantCursorPagination
+
+    def get_queryset(self):
+        return Booking.objects.filter(event_id=self.kwargs.get('pk')).select_related('participant')
+
+
+class EventParticipantExportAPIView(GenericAPIView):
+    """
+    Export the participants of an event as csv (default) or ndjson with ?file_format=
+    streamed from a server side cursor so memory stays flat whatever the event size.
+    """
+    permission_classes = (IsAdminUser, )
+    export_fields = ('participant', 'participant__username', 'participant__email', 'booking_code', 'created_at')
+    header = ('participant', 'username', 'email', 'booking_code', 'booked_at')
+    chunk_size = 2000
+
+    def get(self, request, *args, **kwargs):
+        file_format = request.query_params.get('file_format', 'csv').lower()
+        if file_format not in STREAMERS:
+            raise ValidationError({'file_format': 'Should be one of: {}'.format(', '.join(STREAMERS))})
+
+        event_id = self.kwargs.get('pk')
+        rows = Booking.objects.filter(event_id=event_id).order_by('created_at', 'id').values_list(
+            *self.export_fields
+        ).iterator(chunk_size=self.chunk_size)
+        return STREAMERS[file_format]('event-{}-participants'.format(event_id), self.header, rows)
+
+
+class EventWaitlistAPIView(GenericAPIView):
+    """
+    Join (POST), check the position in (GET) or leave (DELETE)
+    the waitlist of a sold-out event. Seats released by cancelled bookings
+    go to the waitlist in order, without the users retrying to book.
+    """
+    serializer_class = WaitlistEntrySerializer
+    permission_classes = (IsAuthenticated, )
+
+    def get_object(self):
+        try:
+            return WaitlistEntry.objects.get(event_id=self.kwargs.get('pk'), user=self.request.user)
+        except WaitlistEntry.DoesNotExist:
+            raise NotFound('You are not on the waitlist of this event')
+
+    def get(self, request, *args, **kwargs):
+        return Response(self.get_serializer(self.get_object()).data)
+
+    def post(self, request, *args, **kwargs):
+        try:
+            event = Event.objects.get(pk=self.kwargs.get('pk'))
+        except Event.DoesNotExist:
+            raise NotFound('Event not found')
+        try:
+            entry = join_waitlist(event, request.user)
+        except DjangoValidationError as e:
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: e.messages})
+        return Response(self.get_serializer(entry).data, status=status.HTTP_201_CREATED)
+
+    def delete(self, request, *args, **kwargs):
+        self.get_object().delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class EventSeatHoldAPIView(GenericAPIView):
+    """
+    Hold a seat of an event during the checkout (POST), see (GET) or release (DELETE) it.
+    The held seat is taken by the next booking of the requester, until the hold expires.
+    """
+    serializer_class = SeatHoldSerializer
+    permission_classes = (IsAuthenticated, )
+
+    def get_queryset(self):
+        return SeatHold.objects.filter(
+            event_id=self.kwargs.get('pk'), user=self.request.user, expires_at__gt=timezone.now()
+        )
+
+    def get_object(self):
+        hold = self.get_queryset().first()
+        if hold is None:
+            raise NotFound('You hold no seat of this event')
+        return hold
+
+    def get(self, request, *args, **kwargs):
+        return Response(self.get_serializer(self.get_object()).data)
+
+    def post(self, request, *args, **kwargs):
+        try:
+            event = Event.objects.get(pk=self.kwargs.get('pk'))
+        except Event.DoesNotExist:
+            raise NotFound('Event not found')
+        try:
+            hold = hold_seat(event, request.user)
+        except DjangoValidationError as e:
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: e.messages})
+        return Response(self.get_serializer(hold).data, status=status.HTTP_201_CREATED)
+
+    def delete(self, request, *args, **kwargs):
+        with transaction.atomic():
+            released = release_holds(self.get_queryset())
+        if not released:
+            raise NotFound('You hold no seat of this event')
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class EventCacheStatsAPIView(GenericAPIView):
+    """
+    Retrieve the hit/miss counters of the event cache.
+    """
+    permission_classes = (IsAdminUser, )
 
+    def get(self, request, *args, **kwargs):
+        return Response(cache.get_stats())
 
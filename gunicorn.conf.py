@@ -0,0 +1,30 @@
+"""
+Gunicorn config of the production profile, every setting can be overridden
+from the environment, see README.md
+
+    gunicorn event_management_proj.wsgi:application -c gunicorn.conf.py
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8080')
+
+# processes, the common (2 x cores) + 1 by default
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+# gthread when > 1, keep POSTGRESQL_POOL_MAX_SIZE >= threads
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread' if threads > 1 else 'sync')
+
+# recycle the workers after that many requests to bound leaks,
+# the jitter keeps them from restarting all at once
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+# seconds, a worker silent for longer is killed and replaced
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+# seconds given to the workers to finish their requests on restart/shutdown
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+accesslog = '-'
+errorlog = '-'
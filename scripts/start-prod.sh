@@ -0,0 +1,11 @@
+#!/bin/sh
+# Entrypoint of the production profile.
+# migrations are generated and committed in development, only apply them here,
+# set RUN_MIGRATIONS=0 when another container/job runs them
+set -e
+
+if [ "${RUN_MIGRATIONS:-1}" = "1" ]; then
+    python3 manage.py migrate --noinput
+fi
+
+exec gunicorn "${GUNICORN_APP:-event_management_proj.wsgi:application}" -c gunicorn.conf.py